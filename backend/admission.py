@@ -0,0 +1,193 @@
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+
+from metrics import ADMISSION_WAIT, ADMISSION_RESULTS
+
+SERVICE_TIME_ALPHA = 0.2  # EWMA weight of the newest query's duration (for Retry-After)
+MAX_RETRY_AFTER = 60
+
+
+# ==================== ERRORS ====================
+class Overloaded(Exception):
+    """The query was not admitted: 429 when the wait queue is full, 503 when its queue deadline passed."""
+
+    def __init__(self, message: str, status: int, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Slot:
+    # One admitted request holding `weight` concurrency units; release() is idempotent, so every exit path can call it
+    __slots__ = ("_release", "weight", "admitted_at", "released")
+
+    def __init__(self, release, weight: int = 1):
+        self._release = release
+        self.weight = weight
+        self.admitted_at = time.perf_counter()
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+# ==================== SHARED BOOKKEEPING ====================
+class _Admission:
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float, mode: str):
+        self.limit = limit  # 0 = unlimited
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.mode = mode  # metrics label: "sync" (Flask threads) or "async" (event loop)
+        self.active = 0
+        self.waiting = 0
+        self.service_time = 1.0  # EWMA seconds per admitted query
+
+    def _weight(self, weight: int) -> int:
+        # A batch takes one unit per concurrent upstream call, but never more than the whole limit
+        return max(1, min(weight, self.limit)) if self.limit else 1
+
+    def _admitted(self, waited: float, weight: int) -> Slot:
+        ADMISSION_WAIT.observe(waited, self.mode)
+        ADMISSION_RESULTS.inc(self.mode, "admitted")
+        return Slot(self._release, weight)
+
+    def _finished(self, slot: Slot) -> None:
+        elapsed = time.perf_counter() - slot.admitted_at
+        self.service_time += SERVICE_TIME_ALPHA * (elapsed - self.service_time)
+
+    def retry_after(self) -> int:
+        # Seconds until the current queue has likely drained through the slots
+        estimate = self.service_time * (self.waiting + 1) / max(self.limit, 1)
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(estimate)))
+
+    def _reject(self, reason: str, waited: float = 0.0) -> Overloaded:
+        ADMISSION_RESULTS.inc(self.mode, reason)
+        if reason == "queue_full":
+            return Overloaded(f"Too many queued queries ({self.waiting}), try again later", 429, self.retry_after())
+        ADMISSION_WAIT.observe(waited, self.mode)
+        return Overloaded(f"No capacity within {self.queue_timeout:g}s, try again later", 503, self.retry_after())
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "queue_size": self.queue_size,
+            "queue_timeout": self.queue_timeout,
+            "service_time_s": round(self.service_time, 3),
+        }
+
+
+# ==================== THREADED ADMISSION ====================
+class Admission(_Admission):
+    """At most `limit` queries run at once; up to `queue_size` more wait at most `queue_timeout` seconds.
+
+    Anything beyond that fails fast with Overloaded instead of piling more concurrent calls onto
+    Cohere / Pinecone / Groq, so admitted queries keep a bounded latency.
+    """
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float, mode: str = "sync"):
+        super().__init__(limit, queue_size, queue_timeout, mode)
+        self._cond = threading.Condition()
+
+    def acquire(self, weight: int = 1) -> Slot:
+        start, weight = time.perf_counter(), self._weight(weight)
+        with self._cond:
+            # Newcomers never overtake queued queries
+            if not self.limit or (self.active + weight <= self.limit and not self.waiting):
+                self.active += weight
+                return self._admitted(0.0, weight)
+            if self.waiting >= self.queue_size:
+                raise self._reject("queue_full")
+            self.waiting += 1
+            try:
+                admitted = self._cond.wait_for(lambda: self.active + weight <= self.limit, self.queue_timeout)
+            finally:
+                self.waiting -= 1
+            if not admitted:
+                raise self._reject("queue_timeout", time.perf_counter() - start)
+            self.active += weight
+        return self._admitted(time.perf_counter() - start, weight)
+
+    def _release(self, slot: Slot) -> None:
+        with self._cond:
+            self.active -= slot.weight
+            self._finished(slot)
+            self._cond.notify_all()  # waiters need different amounts of room, so each one rechecks
+
+    def run(self, fn, *args, **kwargs):
+        with self.acquire():
+            return fn(*args, **kwargs)
+
+
+# ==================== ASYNC ADMISSION ====================
+class AsyncAdmission(_Admission):
+    """asyncio flavour: queued requests await a future, and freed units go to the oldest waiters first."""
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float, mode: str = "async"):
+        super().__init__(limit, queue_size, queue_timeout, mode)
+        self._waiters = deque()  # (future, weight), oldest first
+
+    async def acquire(self, weight: int = 1) -> Slot:
+        weight = self._weight(weight)
+        if not self.limit or (self.active + weight <= self.limit and not self.waiting):
+            self.active += weight
+            return self._admitted(0.0, weight)
+        if self.waiting >= self.queue_size:
+            raise self._reject("queue_full")
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        waiter = (future, weight)
+        self._waiters.append(waiter)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("queue_timeout", time.perf_counter() - start) from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._give_back(weight)  # the room arrived just as the client went away: pass it on
+            raise
+        finally:
+            self.waiting -= 1
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._hand_over()  # a large waiter leaving can unblock smaller ones behind it
+        return self._admitted(time.perf_counter() - start, weight)
+
+    def _hand_over(self) -> None:
+        # Strict FIFO: the oldest waiter gets the room first, even if a later one would fit now
+        while self._waiters:
+            future, weight = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self.active + weight > self.limit:
+                return
+            self._waiters.popleft()
+            self.active += weight
+            future.set_result(None)
+
+    def _give_back(self, weight: int) -> None:
+        self.active -= weight
+        self._hand_over()
+
+    def _release(self, slot: Slot) -> None:
+        self._finished(slot)
+        self._give_back(slot.weight)
+
+    async def run(self, fn, *args, **kwargs):
+        with await self.acquire():
+            return await fn(*args, **kwargs)
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+
+ASSIGN_BLOCK_ROWS = 8192
+TRAIN_POINTS_PER_LIST = 256  # k-means sample size per list; more barely moves the centroids
+MIN_POINTS_PER_LIST = 32  # below this the corpus is small enough for flat search
+
+
+def default_nlist(count: int) -> int:
+    return max(1, int(4 * np.sqrt(count)))
+
+
+# ==================== IVF-FLAT INDEX ====================
+class IVFIndex:
+    """Inverted-file index over normalized vectors: spherical k-means centroids, every row filed
+    under its nearest one. A query only scores the rows of its `nprobe` closest lists.
+
+    `assignments` (list id per row, in store row order) is the source of truth, so inserts append
+    and deletes reuse the store's row selection; the per-list row arrays are rebuilt lazily.
+    """
+
+    def __init__(self, centroids, assignments, trained_size: int):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.trained_size = trained_size  # corpus size at the last training
+        self._lists = None
+
+    def __len__(self):
+        return self.assignments.shape[0]
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    # ---------- training ----------
+    @classmethod
+    def train(cls, vectors, nlist: int = 0, iterations: int = 10, seed: int = 0):
+        nlist = min(nlist or default_nlist(len(vectors)), len(vectors))
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), nlist * TRAIN_POINTS_PER_LIST)
+        sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = cls._nearest(centroids, sample)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]  # reseed dead lists
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        return cls(centroids, cls._nearest(centroids, vectors), len(vectors))
+
+    @staticmethod
+    def _nearest(centroids, vectors):
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+            labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    def needs_retrain(self) -> bool:
+        # Lists trained on a quarter of today's corpus no longer partition it well
+        return len(self) >= 4 * self.trained_size
+
+    # ---------- writes (mirror the store's row order) ----------
+    def add(self, vectors) -> None:
+        self.assignments = np.concatenate([self.assignments, self._nearest(self.centroids, vectors)])
+        self._lists = None
+
+    def take(self, rows):
+        return type(self)(self.centroids, self.assignments[rows], self.trained_size)
+
+    # ---------- search ----------
+    def _inverted_lists(self):
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable").astype(np.int64)
+            offsets = np.searchsorted(self.assignments[order], np.arange(self.nlist + 1))
+            self._lists = (order, offsets)
+        return self._lists
+
+    def probe(self, query, nprobe: int):
+        # Sorted candidate rows from the nprobe lists whose centroids are closest to the query
+        order, offsets = self._inverted_lists()
+        nprobe = min(nprobe, self.nlist)
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([order[offsets[i]:offsets[i + 1]] for i in lists]))
+
+    # ---------- persistence ----------
+    def save(self, path: str) -> None:
+        np.savez(f"{path}.{os.getpid()}.tmp.npz", centroids=self.centroids, assignments=self.assignments,
+                 trained_size=np.int64(self.trained_size))
+        os.replace(f"{path}.{os.getpid()}.tmp.npz", f"{path}.npz")
+
+    @classmethod
+    def load(cls, path: str):
+        if not os.path.exists(f"{path}.npz"):
+            return None
+        arrays = np.load(f"{path}.npz")
+        return cls(arrays["centroids"], arrays["assignments"], int(arrays["trained_size"]))
@@ -0,0 +1,104 @@
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# ==================== SEMANTIC ANSWER CACHE ====================
+class SemanticAnswerCache:
+    """Answers keyed by query embedding; a lookup hits when cosine similarity >= threshold.
+
+    Questions answered without an embedding (keyword-index hits) use the exact-key side instead.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl_seconds: float = 3600, max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None  # (max_entries, dim) float32, allocated on first store
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._values = [None] * max_entries
+        self._size = 0
+        self._exact = OrderedDict()  # key -> (expires, value), least recently used first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector):
+        query = self._normalize(vector)
+        with self._lock:
+            if self._size:
+                now = time.monotonic()
+                scores = self._vectors[:self._size] @ query
+                scores[self._expires[:self._size] < now] = -np.inf
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._last_used[best] = now
+                    self.hits += 1
+                    return self._values[best]
+            self.misses += 1
+            return None
+
+    def store(self, vector, value) -> None:
+        if self.max_entries <= 0:
+            return
+        query = self._normalize(vector)
+        with self._lock:
+            now = time.monotonic()
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, query.shape[0]), dtype=np.float32)
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                # Reuse an expired slot if there is one, otherwise the least recently used
+                expired = np.flatnonzero(self._expires < now)
+                slot = int(expired[0]) if expired.size else int(np.argmin(self._last_used))
+            self._vectors[slot] = query
+            self._expires[slot] = now + self.ttl_seconds
+            self._last_used[slot] = now
+            self._values[slot] = value
+
+    def lookup_exact(self, key: str):
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._exact.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def store_exact(self, key: str, value) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._exact[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_entries:
+                self._exact.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._size = 0
+            self._values = [None] * self.max_entries
+            self._exact.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": self._size,
+            "exact_entries": len(self._exact),
+            "threshold": self.threshold,
+        }
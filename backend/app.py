@@ -1,79 +1,115 @@
 import os
 import json
-from flask import Flask, request, jsonify
+import hmac
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from dotenv import load_dotenv
 
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_cohere import CohereEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from langchain_groq import ChatGroq
-from pinecone import Pinecone
-
-# ==================== LOAD ENVIRONMENT VARIABLES ====================
-load_dotenv()
-COHERE_API_KEY = os.getenv("COHERE_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+import config
+import rag
+import hot_reload
+import metrics
+from corpus_registry import parse_filter
+from admission import Overloaded
 
 # ==================== FLASK APP SETUP ====================
 app = Flask(__name__)
-CORS(app)  # ✅ Allow all origins for your Chrome extension
-
-# ==================== LOAD AND SPLIT PDF ====================
-print("📄 Loading SQL Manual PDF...")
-loader = PyPDFLoader("SQL-Manual.pdf")
-pages = loader.load()
+CORS(app, expose_headers=["Retry-After"])  # ✅ Allow all origins for your Chrome extension
 
-text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-docs = text_splitter.split_documents(pages)
-print(f"✅ Loaded and split into {len(docs)} chunks")
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # keep proxies from buffering
 
-# ==================== PINECONE SETUP ====================
-embeddings = CohereEmbeddings(model="embed-english-v3.0", cohere_api_key=COHERE_API_KEY)
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index_name = "pdf-chat-index"
+def batch_queries(data):
+    # Returns (queries, error message) for a /query/batch body: {"queries": ["...", ...]}
+    queries = (data or {}).get("queries")
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        return None, "Expected a JSON body like {\"queries\": [\"...\"]}"
+    if len(queries) > config.BATCH_MAX_QUERIES:
+        return None, f"At most {config.BATCH_MAX_QUERIES} queries per batch"
+    return queries, None
 
-vectorstore = PineconeVectorStore.from_documents(docs, embedding=embeddings, index_name=index_name)
-print("✅ Vector store connected successfully")
+def query_filter(data):
+    # Optional {"document": "..."} / {"dialect": "..."} in any query body -> (filter, error message)
+    return parse_filter(rag.live.registry, data)
 
-# ==================== LLM SETUP ====================
-llm = ChatGroq(groq_api_key=GROQ_API_KEY, model_name="llama-3.1-8b-instant")
-print("🤖 Connected to Groq LLM")
-
-# ==================== RAG FUNCTION ====================
-def get_answer(query: str) -> str:
+def released_after(events, slot):
+    # Holds the admission slot for the whole stream
     try:
-        results = vectorstore.similarity_search(query, k=3)
-        context = "\n\n".join([r.page_content for r in results])
-
-        prompt = f"""
-You are a helpful SQL tutor. Use the given context and your SQL knowledge.
-Explain the answer clearly and give short examples if useful.
+        yield from events
+    finally:
+        slot.release()
 
-Context:
-{context}
-
-Question:
-{query}
-
-Answer:
-"""
-
-        response = llm.invoke(prompt)
-        return response.content.strip()
-    except Exception as e:
-        return f"⚠️ Error processing query: {str(e)}"
+@app.errorhandler(Overloaded)
+def overloaded(e):
+    # Shed load fast: 429 (queue full) / 503 (queue deadline passed), with a hint when to come back
+    return jsonify({"error": str(e)}), e.status, {"Retry-After": str(e.retry_after)}
 
 # ==================== API ROUTE ====================
 @app.route("/query", methods=["POST"])
 def query():
     data = request.json
     query_text = data.get("query", "")
-    answer = get_answer(query_text)
+    filter, error = query_filter(data)
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        # Only the single-flight leader takes an admission slot; followers wait on its result
+        answer = rag.inflight.do(rag.flight_key(query_text, filter), rag.admission.run, rag.answer_query, query_text, filter)
+    except Overloaded:
+        raise
+    except Exception as e:
+        return jsonify({"error": rag.error_message(e)}), 502  # upstream (Cohere / Pinecone / Groq) failure
     return jsonify({"answer": answer})
 
+@app.route("/query/stream", methods=["POST"])
+def query_stream():
+    data = request.json
+    query_text = data.get("query", "")
+    filter, error = query_filter(data)
+    if error:
+        return jsonify({"error": error}), 400
+    slot = rag.admission.acquire()  # before the 200 goes out, so overflow still gets a 429 / 503
+    response = Response(stream_with_context(released_after(rag.stream_answer(query_text, filter), slot)),
+                        mimetype="text/event-stream", headers=SSE_HEADERS)
+    response.call_on_close(slot.release)  # a client that leaves before the first event
+    return response
+
+@app.route("/query/batch", methods=["POST"])
+def query_batch():
+    queries, error = batch_queries(request.json)
+    filter, filter_error = query_filter(request.json)
+    if error or filter_error:
+        return jsonify({"error": error or filter_error}), 400
+    with rag.admission.acquire(rag.batch_weight(queries)):
+        return jsonify({"results": rag.get_answers(queries, filter)})
+
+@app.route("/documents", methods=["GET"])
+def documents():
+    return jsonify({"documents": [{k: entry[k] for k in ("id", "dialect", "title")} for entry in rag.live.registry]})
+
+# ==================== ADMIN ====================
+@app.route("/admin/reindex", methods=["POST"])
+def admin_reindex():
+    # Re-ingests in the background; queries keep being answered from the current corpus until the swap
+    token = request.headers.get("X-Admin-Token", "")
+    if not config.ADMIN_TOKEN or not hmac.compare_digest(token, config.ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({"reload": hot_reload.start_reindex("admin"), "status": hot_reload.reload_status()}), 202
+
+@app.route("/admin/reindex", methods=["GET"])
+def admin_reindex_status():
+    return jsonify(hot_reload.reload_status())
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    return jsonify(rag.stats())
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+# ==================== CORPUS WATCHER ====================
+if config.RELOAD_WATCH:
+    hot_reload.start_watcher()
+
 # ==================== RUN FLASK ====================
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8502))  # Render sets PORT env variable
@@ -0,0 +1,84 @@
+import os
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from a2wsgi import WSGIMiddleware
+
+import rag
+from app import app as flask_app, SSE_HEADERS, batch_queries, query_filter
+from admission import Overloaded
+
+# Async serving mode: the hot query routes run on the event loop with the async
+# Cohere / Pinecone / Groq clients; every other route falls through to the Flask app.
+#   uvicorn asgi:app --host 0.0.0.0 --port 8502
+
+# ==================== ASYNC ROUTES ====================
+async def released_after(events, slot):
+    try:
+        async for event in events:
+            yield event
+    finally:
+        slot.release()
+
+async def overloaded(request, e):
+    return JSONResponse({"error": str(e)}, status_code=e.status, headers={"Retry-After": str(e.retry_after)})
+
+async def query(request):
+    data = await request.json()
+    query_text = data.get("query", "")
+    filter, error = query_filter(data)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    try:
+        answer = await rag.ainflight.do(
+            rag.flight_key(query_text, filter), rag.aadmission.run, rag.aanswer_query, query_text, filter,
+        )
+    except Overloaded:
+        raise
+    except Exception as e:
+        return JSONResponse({"error": rag.error_message(e)}, status_code=502)
+    return JSONResponse({"answer": answer})
+
+async def query_stream(request):
+    data = await request.json()
+    query_text = data.get("query", "")
+    filter, error = query_filter(data)
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    slot = await rag.aadmission.acquire()
+    return StreamingResponse(released_after(rag.astream_answer(query_text, filter), slot), media_type="text/event-stream",
+                             headers=SSE_HEADERS, background=BackgroundTask(slot.release))
+
+async def query_batch(request):
+    data = await request.json()
+    queries, error = batch_queries(data)
+    filter, filter_error = query_filter(data)
+    if error or filter_error:
+        return JSONResponse({"error": error or filter_error}, status_code=400)
+    with await rag.aadmission.acquire(rag.batch_weight(queries)):
+        return JSONResponse({"results": await rag.aget_answers(queries, filter)})
+
+# ==================== ASGI APP ====================
+app = Starlette(
+    routes=[
+        Route("/query", query, methods=["POST"]),
+        Route("/query/stream", query_stream, methods=["POST"]),
+        Route("/query/batch", query_batch, methods=["POST"]),
+        Mount("/", app=WSGIMiddleware(flask_app)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],
+                           expose_headers=["Retry-After"])],
+    exception_handlers={Overloaded: overloaded},
+)
+
+# ==================== RUN UVICORN ====================
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.environ.get("PORT", 8502))
+    print(f"🚀 Async API running on port {port}")
+    uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,86 @@
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from local_store import LocalVectorStore
+from ann_index import MIN_POINTS_PER_LIST
+from bench.quantization import PrecomputedEmbeddings, synthetic_vectors, sample_queries
+
+
+# ==================== MEASUREMENTS ====================
+def build_store(vectors, index: str, nlist: int, quantization: str):
+    store = LocalVectorStore(PrecomputedEmbeddings(vectors), index=index, nlist=nlist, quantization=quantization)
+    ids = [str(row) for row in range(len(vectors))]
+    start = time.perf_counter()
+    store.add_texts(ids, ids=ids)
+    return store, time.perf_counter() - start
+
+
+def run(store, queries, k: int):
+    found, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found.append([doc.id for doc in store.similarity_search_by_vector(query, k=k)])
+        latencies.append(time.perf_counter() - start)
+    return found, 1000 * np.percentile(latencies, 50), 1000 * np.percentile(latencies, 95)
+
+
+def recall(found, exact) -> float:
+    return float(np.mean([len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(found, exact)]))
+
+
+# ==================== MAIN ====================
+def main():
+    # python -m bench.ann --sizes 10000 50000 200000
+    # python -m bench.ann --index .index/local --sizes 1000 5000 --nlist 16
+    parser = argparse.ArgumentParser(description="Recall vs latency of the IVF index against flat search.")
+    parser.add_argument("--index", help="local index directory (vectors.npy); sizes become prefixes of it")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0,
+                        help=f"0 = 4 * sqrt(size), which needs ~16k vectors to train; sizes need >= {MIN_POINTS_PER_LIST} * nlist")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--quantization", default="none", help="codes scanned inside the probed lists")
+    args = parser.parse_args()
+
+    source = np.load(f"{args.index}/vectors.npy", mmap_mode="r") if args.index else None
+    for size in args.sizes:
+        if source is not None:
+            vectors = np.asarray(source[:size], dtype=np.float32)
+        else:
+            vectors = synthetic_vectors(size, args.dim)
+        queries = sample_queries(vectors, args.queries)
+
+        flat, _ = build_store(vectors, "flat", 0, "none")
+        exact, flat_p50, flat_p95 = run(flat, queries, args.k)
+        report = {"corpus": "real" if source is not None else "synthetic", "vectors": len(vectors),
+                  "flat_p50_ms": round(flat_p50, 3), "flat_p95_ms": round(flat_p95, 3)}
+
+        ivf, build_seconds = build_store(vectors, "ivf", args.nlist, args.quantization)
+        if ivf._ivf is None:
+            report["ivf"] = f"corpus too small to train (needs {MIN_POINTS_PER_LIST} vectors per list, see --nlist)"
+            json.dump(report, sys.stdout)
+            print()
+            continue
+        report.update({"nlist": ivf._ivf.nlist, "ivf_build_s": round(build_seconds, 2), "sweep": []})
+        for nprobe in args.nprobe:
+            ivf.nprobe = nprobe
+            found, p50, p95 = run(ivf, queries, args.k)
+            report["sweep"].append({
+                "nprobe": nprobe,
+                f"recall_at_{args.k}": round(recall(found, exact), 4),
+                "p50_ms": round(p50, 3),
+                "p95_ms": round(p95, 3),
+                "speedup_p50": round(flat_p50 / max(p50, 1e-9), 2),
+            })
+        json.dump(report, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main()
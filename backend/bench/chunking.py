@@ -0,0 +1,47 @@
+import sys
+import json
+import argparse
+
+import config
+from ingest import splitter_params
+from pdf_loader import load_and_split_parallel
+from prompts import PROMPT_TEMPLATE
+from context_builder import estimate_tokens
+
+
+# ==================== MAIN ====================
+def main():
+    # python -m bench.chunking SQL-Manual.pdf
+    parser = argparse.ArgumentParser(description="Compare the recursive and structure-aware splitters.")
+    parser.add_argument("pdf", nargs="?", default=config.PDF_PATH)
+    parser.add_argument("-k", type=int, default=config.TOP_K, help="chunks per prompt")
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS)
+    args = parser.parse_args()
+
+    template_tokens = estimate_tokens(PROMPT_TEMPLATE)
+    baseline = None
+    for splitter in ("recursive", "structured"):
+        params = splitter_params(splitter)
+        docs = load_and_split_parallel(
+            args.pdf, params["chunk_size"], params["chunk_overlap"], workers=args.workers, splitter=splitter,
+        )
+        chunk_tokens = [estimate_tokens(doc.page_content) for doc in docs]
+        mean_tokens = sum(chunk_tokens) / max(len(docs), 1)
+        result = {
+            "splitter": splitter,
+            "chunks_embedded": len(docs),
+            "total_chunk_tokens": round(sum(chunk_tokens)),
+            "mean_chunk_tokens": round(mean_tokens, 1),
+            "mean_prompt_tokens": round(template_tokens + args.k * mean_tokens, 1),
+        }
+        if baseline is None:
+            baseline = result
+        else:
+            result["chunks_vs_recursive"] = round(len(docs) / max(baseline["chunks_embedded"], 1), 3)
+            result["tokens_vs_recursive"] = round(sum(chunk_tokens) / max(baseline["total_chunk_tokens"], 1), 3)
+        json.dump(result, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import sys
+import json
+import time
+import argparse
+
+from providers import make_embeddings, make_vectorstore
+
+
+# ==================== QUESTIONS ====================
+def load_questions(path: str):
+    # JSONL with a "question" field, or one plain-text question per line
+    questions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            questions.append(json.loads(line)["question"] if line.startswith("{") else line)
+    return questions
+
+
+def timed_search(store, vector, k: int):
+    start = time.perf_counter()
+    results = store.similarity_search_by_vector(vector, k=k)
+    return [doc.metadata.get("chunk_id") for doc in results], time.perf_counter() - start
+
+
+# ==================== MAIN ====================
+def main():
+    parser = argparse.ArgumentParser(description="Check that the local index returns Pinecone's top-k.")
+    parser.add_argument("questions", help="JSONL eval set or a text file with one question per line")
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    embeddings = make_embeddings()
+    pinecone = make_vectorstore(embeddings, backend="pinecone")
+    local = make_vectorstore(embeddings, backend="local")
+
+    overlap, exact, pinecone_time, local_time = 0.0, 0, 0.0, 0.0
+    questions = load_questions(args.questions)
+    for question in questions:
+        vector = embeddings.embed_query(question)
+        remote_ids, remote_elapsed = timed_search(pinecone, vector, args.k)
+        local_ids, local_elapsed = timed_search(local, vector, args.k)
+        overlap += len(set(remote_ids) & set(local_ids)) / max(len(remote_ids), 1)
+        exact += remote_ids == local_ids
+        pinecone_time += remote_elapsed
+        local_time += local_elapsed
+
+    n = max(len(questions), 1)
+    json.dump({
+        "questions": len(questions),
+        "k": args.k,
+        "mean_overlap_at_k": overlap / n,
+        "exact_order_match": exact / n,
+        "pinecone_ms": 1000 * pinecone_time / n,
+        "local_ms": 1000 * local_time / n,
+    }, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import sys
+import json
+import math
+import time
+import argparse
+import itertools
+
+import config
+from bench.load import percentile
+from bench.retrieval import load_eval_set
+from providers import make_embeddings
+from local_store import LocalVectorStore
+from retrieval import Retriever
+from sparse_index import BM25Index
+from reranker import CrossEncoderReranker, resolve_model_files
+from chunk_store import load_or_build
+from pdf_loader import load_and_split_parallel
+from ingestion import chunk_hash, vector_id, UPSERT_BATCH_SIZE
+from corpus_registry import load_registry, partition_metadata, parse_filter
+
+
+# ==================== RELEVANCE ====================
+# An eval item: {"question": "...", "pages": [12, 13]} (1-based) and/or {"chunks": ["<chunk_id>", ...]},
+# optionally with "document" / "dialect" to search one partition, exactly like a /query body.
+def relevant_key(doc, item):
+    # What a retrieved chunk "counts as": its chunk id, or its page; None if it is not relevant
+    if doc.metadata.get("chunk_id") in item.get("chunks", ()):
+        return doc.metadata["chunk_id"]
+    page = doc.metadata.get("page", -2) + 1
+    if page in item.get("pages", ()) and item.get("document", doc.metadata.get("document")) == doc.metadata.get("document"):
+        return f"page:{page}"
+    return None
+
+
+def score_ranking(docs, item, k: int) -> dict:
+    # Binary relevance; a second chunk of an already-found page earns nothing, so duplicates don't inflate scores
+    expected = len(item.get("chunks", ())) + len(item.get("pages", ()))
+    found, first_rank, dcg = set(), None, 0.0
+    for rank, doc in enumerate(docs[:k], start=1):
+        key = relevant_key(doc, item)
+        if key is None or key in found:
+            continue
+        found.add(key)
+        first_rank = first_rank or rank
+        dcg += 1.0 / math.log2(rank + 1)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(expected, k) + 1))
+    return {
+        "recall": len(found) / expected if expected else 0.0,
+        "mrr": 1.0 / first_rank if first_rank else 0.0,
+        "ndcg": dcg / ideal if ideal else 0.0,
+    }
+
+
+# ==================== CORPUS PER CHUNKING ====================
+def load_chunks_for(registry, splitter: str, chunk_size: int, chunk_overlap: int, workers: int):
+    # Same parsing, tagging and chunk ids as ingest.py, with this configuration's chunking (cached apart from ingest's)
+    params = {"splitter": splitter, "chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+    docs = {}  # chunk_id -> chunk: identical chunks are indexed once, as sync_index does
+    for entry in registry:
+        def build():
+            return load_and_split_parallel(entry["path"], chunk_size, chunk_overlap, workers=workers, splitter=splitter)
+        document_docs = load_or_build(entry["path"], params, build, config.EVAL_CHUNK_CACHE_DIR)
+        for doc in document_docs:
+            doc.metadata.update(partition_metadata(entry))
+            doc.metadata["chunk_id"] = vector_id(doc, chunk_hash(doc))
+            docs.setdefault(doc.metadata["chunk_id"], doc)
+    return list(docs.values())
+
+
+def build_indexes(docs, embeddings):
+    # In-process cosine index (the same ranking Pinecone computes) + BM25, so chunkings can be compared
+    store = LocalVectorStore(embeddings)
+    for start in range(0, len(docs), UPSERT_BATCH_SIZE):
+        batch = docs[start:start + UPSERT_BATCH_SIZE]
+        store.add_texts([doc.page_content for doc in batch], metadatas=[doc.metadata for doc in batch],
+                        ids=[doc.metadata["chunk_id"] for doc in batch])
+    return store, BM25Index.build(docs)
+
+
+def make_eval_reranker():
+    # No latency budget: a pass past RERANK_BUDGET_MS would quietly fall back to vector order and the
+    # "rerank" rows would partly measure dense retrieval instead of the cross-encoder
+    model_path, tokenizer_path = resolve_model_files(config.RERANK_MODEL, config.RERANK_MODEL_FILE)
+    return CrossEncoderReranker(
+        model_path, tokenizer_path, budget_ms=None, max_length=config.RERANK_MAX_LENGTH,
+        cache_size=0, threads=config.RERANK_THREADS,
+    )
+
+
+# ==================== EVALUATION ====================
+def evaluate(name: str, retriever, items, vectors, filters, k: int, per_query=None) -> dict:
+    totals = {"recall": 0.0, "mrr": 0.0, "ndcg": 0.0}
+    latencies = []
+    for item, vector, filter in zip(items, vectors, filters):
+        start = time.perf_counter()
+        docs = retriever.retrieve(item["question"], vector, filter)
+        latency = time.perf_counter() - start
+        latencies.append(latency)
+        scores = score_ranking(docs, item, k)
+        for metric, value in scores.items():
+            totals[metric] += value
+        if per_query is not None:
+            json.dump({"config": name, "question": item["question"], **scores, "latency_ms": round(1000 * latency, 3),
+                       "retrieved": [doc.metadata.get("chunk_id") for doc in docs]}, per_query)
+            per_query.write("\n")
+    count = max(len(items), 1)
+    return {
+        f"recall@{k}": round(totals["recall"] / count, 4),
+        "mrr": round(totals["mrr"] / count, 4),
+        f"ndcg@{k}": round(totals["ndcg"] / count, 4),
+        "mean_ms": round(1000 * sum(latencies) / max(len(latencies), 1), 3),
+        "p50_ms": round(1000 * percentile(latencies, 0.50), 3),
+        "p95_ms": round(1000 * percentile(latencies, 0.95), 3),
+    }
+
+
+def select(results, metric: str, bar: float):
+    # The lowest-p95 configuration whose quality metric (recall, mrr or ndcg; @k added per config) meets the bar
+    passing = [r for r in results if next(v for key, v in r.items() if key.split("@")[0] == metric) >= bar]
+    return min(passing, key=lambda r: r["p95_ms"]) if passing else None
+
+
+# ==================== MAIN ====================
+def main():
+    # python -m bench.eval eval.jsonl --chunk-size 500 1000 --overlap 100 200 -k 3 5 --mode dense hybrid --rerank 0 1
+    parser = argparse.ArgumentParser(description="Score retriever configurations on a labeled question set.")
+    parser.add_argument("eval_set", help="JSONL: question + expected pages and/or chunk ids")
+    parser.add_argument("--registry", default=config.CORPUS_REGISTRY, help="corpus to index (default: as ingest.py)")
+    parser.add_argument("--splitter", nargs="+", choices=["recursive", "structured"], default=["recursive"])
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[config.CHUNK_SIZE])
+    parser.add_argument("--overlap", type=int, nargs="+", default=[config.CHUNK_OVERLAP])
+    parser.add_argument("-k", type=int, nargs="+", default=[config.TOP_K])
+    parser.add_argument("--mode", nargs="+", choices=["dense", "hybrid"], default=["dense", "hybrid"])
+    parser.add_argument("--rerank", type=int, nargs="+", choices=[0, 1], default=[0])
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS)
+    parser.add_argument("--per-query", help="also write one JSON line per (config, question) here")
+    parser.add_argument("--metric", choices=["recall", "mrr", "ndcg"], default="recall", help="quality bar metric")
+    parser.add_argument("--bar", type=float, help="pick the fastest configuration with metric >= bar")
+    args = parser.parse_args()
+
+    items = load_eval_set(args.eval_set)
+    registry = load_registry(args.registry, config.PDF_PATH)
+    filters = []
+    for item in items:
+        filter, error = parse_filter(registry, item)
+        if error:
+            sys.exit(f"{item['question']!r}: {error}")
+        filters.append(filter)
+
+    embeddings = make_embeddings()
+    # Query vectors are shared by every configuration, so the timings below are retrieval only
+    vectors = embeddings.embed_queries([item["question"] for item in items])
+    reranker = make_eval_reranker() if 1 in args.rerank else None
+    per_query = open(args.per_query, "w", encoding="utf-8") if args.per_query else None
+
+    results = []
+    for splitter, chunk_size, overlap in itertools.product(args.splitter, args.chunk_size, args.overlap):
+        if splitter == "structured" and overlap != args.overlap[0]:
+            continue  # the structured splitter has no overlap
+        docs = load_chunks_for(registry, splitter, chunk_size, overlap, args.workers)
+        store, sparse = build_indexes(docs, embeddings)
+        for k, mode, rerank in itertools.product(args.k, args.mode, args.rerank):
+            retriever = Retriever(store, sparse=sparse, mode=mode, k=k, candidates=config.HYBRID_CANDIDATES,
+                                  reranker=reranker if rerank else None, rerank_candidates=config.RERANK_CANDIDATES)
+            chunking = f"{splitter}-{chunk_size}" + ("" if splitter == "structured" else f"/{overlap}")
+            name = f"{chunking} k={k} {mode}" + (" rerank" if rerank else "")
+            if rerank:
+                retriever.retrieve(items[0]["question"], vectors[0], filters[0])  # load the model untimed
+            result = {"config": name, "chunks": len(docs),
+                      **evaluate(name, retriever, items, vectors, filters, k, per_query)}
+            results.append(result)
+            json.dump(result, sys.stdout)
+            print(flush=True)
+
+    if per_query is not None:
+        per_query.close()
+    if args.bar is not None:
+        best = select(results, args.metric, args.bar)
+        json.dump({"selected": best["config"] if best else None, "metric": args.metric, "bar": args.bar}, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+import httpx
+
+
+# ==================== LOAD GENERATOR ====================
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run_level(url: str, questions, concurrency: int, total: int, unique: bool) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker(client):
+        nonlocal errors
+        for i in counter:
+            question = questions[i % len(questions)]
+            if unique:
+                question = f"{question} (#{i})"  # defeat the answer cache and single-flight
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json={"query": question})
+                response.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": 1000 * percentile(latencies, 0.50),
+        "p95_ms": 1000 * percentile(latencies, 0.95),
+        "p99_ms": 1000 * percentile(latencies, 0.99),
+    }
+
+
+# ==================== MAIN ====================
+def main():
+    # python -m bench.load --url http://127.0.0.1:8502/query --concurrency 1 8 32 128 256
+    parser = argparse.ArgumentParser(description="Concurrency sweep against a running /query endpoint.")
+    parser.add_argument("--url", default="http://127.0.0.1:8502/query")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--questions", help="text file with one question per line")
+    parser.add_argument("--unique", action="store_true", help="make every question distinct")
+    args = parser.parse_args()
+
+    questions = ["What is a LEFT JOIN?"]
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_level(args.url, questions, concurrency, args.requests, args.unique))
+        json.dump(result, sys.stdout)
+        print(flush=True)
+
+
+if __name__ == "__main__":
+    main()
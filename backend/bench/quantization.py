@@ -0,0 +1,97 @@
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from local_store import LocalVectorStore
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """Texts are row numbers into a vector matrix, so stores can be built without an embedding API."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return self.vectors[[int(text) for text in texts]]
+
+    def embed_query(self, text):
+        return self.vectors[int(text)]
+
+
+# ==================== CORPORA ====================
+def synthetic_vectors(count: int, dim: int, clusters: int = 256, seed: int = 0):
+    # Clustered like real embeddings (topics), not uniform noise where every vector is orthogonal
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.8 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def sample_queries(vectors, count: int, noise: float = 0.5, seed: int = 1):
+    # Perturbed corpus rows stand in for questions about those chunks
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)] + noise * rng.standard_normal((count, vectors.shape[1])) / np.sqrt(vectors.shape[1])
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+# ==================== MEASUREMENTS ====================
+def build_store(vectors, quantization: str, rescore_factor: int):
+    store = LocalVectorStore(PrecomputedEmbeddings(vectors), quantization=quantization, rescore_factor=rescore_factor)
+    store.add_texts([str(row) for row in range(len(vectors))], ids=[str(row) for row in range(len(vectors))])
+    return store
+
+
+def run(store, queries, k: int):
+    start = time.perf_counter()
+    found = [[doc.id for doc in store.similarity_search_by_vector(query, k=k)] for query in queries]
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    store.similarity_search_by_vectors(queries, k=k)
+    batch_elapsed = time.perf_counter() - start
+    return found, len(queries) / max(elapsed, 1e-9), len(queries) / max(batch_elapsed, 1e-9)
+
+
+# ==================== MAIN ====================
+def main():
+    # python -m bench.quantization --count 100000
+    # python -m bench.quantization --index .index/local
+    parser = argparse.ArgumentParser(description="Memory, QPS and recall of int8 / binary quantization vs float32.")
+    parser.add_argument("--index", help="local index directory (vectors.npy) instead of synthetic vectors")
+    parser.add_argument("--count", type=int, default=50000, help="synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--rescore-factor", type=int, default=0, help="0 = per-mode default")
+    args = parser.parse_args()
+
+    if args.index:
+        vectors = np.asarray(np.load(f"{args.index}/vectors.npy"), dtype=np.float32)
+    else:
+        vectors = synthetic_vectors(args.count, args.dim)
+    queries = sample_queries(vectors, args.queries)
+
+    exact = None
+    for quantization in ("none", "int8", "binary"):
+        store = build_store(vectors, quantization, args.rescore_factor)
+        found, qps, batch_qps = run(store, queries, args.k)
+        if exact is None:
+            exact = found
+        recall = np.mean([len(set(a) & set(b)) / max(len(a), 1) for a, b in zip(found, exact)])
+        json.dump({
+            "quantization": quantization,
+            "vectors": len(store),
+            "rescore_factor": store.rescore_factor if quantization != "none" else None,
+            "bytes_per_vector": round(store.search_bytes / max(len(store), 1), 1),
+            "qps": round(qps, 1),
+            "batch_qps": round(batch_qps, 1),
+            f"recall_at_{args.k}": round(float(recall), 4),
+        }, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import sys
+import json
+import time
+import argparse
+
+import config
+from providers import make_embeddings, make_vectorstore
+from retrieval import Retriever
+from sparse_index import BM25Index
+from chunk_store import load_chunks
+
+
+# ==================== EVAL SET ====================
+def load_eval_set(path: str):
+    # JSONL: {"question": "...", "pages": [12, 13]} with 1-based page numbers
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def recall_at_k(docs, expected_pages) -> float:
+    found = {doc.metadata.get("page", -1) + 1 for doc in docs}
+    expected = set(expected_pages)
+    return len(found & expected) / len(expected) if expected else 0.0
+
+
+# ==================== MAIN ====================
+def main():
+    parser = argparse.ArgumentParser(description="Compare dense-only and hybrid (BM25 + dense) retrieval.")
+    parser.add_argument("eval_set", help="JSONL with question + expected pages")
+    parser.add_argument("-k", type=int, default=config.TOP_K)
+    args = parser.parse_args()
+
+    items = load_eval_set(args.eval_set)
+    embeddings = make_embeddings()
+    vectorstore = make_vectorstore(embeddings)
+    sparse = BM25Index.load(config.SPARSE_INDEX_DIR, load_chunks(config.CORPUS_PATH) or [])
+    # Embed up front so both modes are timed on retrieval only
+    vectors = embeddings.embed_queries([item["question"] for item in items])
+
+    for mode in ("dense", "hybrid"):
+        retriever = Retriever(vectorstore, sparse=sparse, mode=mode, k=args.k, candidates=config.HYBRID_CANDIDATES)
+        if retriever.mode != mode:
+            print(f"⚠️ Skipping {mode}: no BM25 index at {config.SPARSE_INDEX_DIR}", file=sys.stderr)
+            continue
+        recall, latencies = 0.0, []
+        for item, vector in zip(items, vectors):
+            start = time.perf_counter()
+            docs = retriever.retrieve(item["question"], vector)
+            latencies.append(time.perf_counter() - start)
+            recall += recall_at_k(docs, item.get("pages", []))
+        latencies.sort()
+        json.dump({
+            "mode": mode,
+            "queries": len(items),
+            f"recall@{args.k}": recall / max(len(items), 1),
+            "mean_ms": 1000 * sum(latencies) / max(len(latencies), 1),
+            "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        }, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main()
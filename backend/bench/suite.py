@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import tempfile
+import argparse
+import platform
+import subprocess
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.load import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_QUESTIONS = [
+    "What is a LEFT JOIN?",
+    "How does GROUP BY work with HAVING?",
+    "Explain the CASE expression",
+    "How do I create a table with a primary key?",
+    "What does COALESCE return?",
+    "When should I use UNION ALL instead of UNION?",
+]
+# Metrics where a bigger number is an improvement; everything else (ms, s, MB) should go down
+HIGHER_IS_BETTER = ("per_sec", "rps")
+NOT_METRICS = ("concurrency", "requests", "pages", "chunks")  # workload sizes, not results
+
+
+# ==================== ENVIRONMENT ====================
+def bench_env(args, workdir: str) -> dict:
+    # Every provider is a local fake, and every artifact lives in a throwaway INDEX_DIR
+    return {
+        "OFFLINE": "1",
+        "EMBEDDING_PROVIDER": "fake",
+        "VECTOR_BACKEND": "fake",
+        "LLM_PROVIDER": "fake",
+        "INDEX_DIR": os.path.join(workdir, "index"),
+        "FAKE_INDEX_DIR": os.path.join(workdir, "index", "fake"),
+        "PDF_PATH": os.path.abspath(args.pdf),
+        "CORPUS_REGISTRY": os.path.join(workdir, "no-registry.json"),
+        "RELOAD_WATCH": "0",
+        "FAKE_EMBED_LATENCY_MS": str(args.embed_ms),
+        "FAKE_SEARCH_LATENCY_MS": str(args.search_ms),
+        "FAKE_LLM_TTFT_MS": str(args.ttft_ms),
+        "FAKE_LLM_TOKEN_MS": str(args.token_ms),
+        "FAKE_EMBED_JITTER_MS": str(args.jitter_ms),
+        "FAKE_SEARCH_JITTER_MS": str(args.jitter_ms),
+        "FAKE_LLM_JITTER_MS": str(args.jitter_ms),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def max_rss_mb(usage) -> float:
+    return round(usage.ru_maxrss / 1024, 1)  # Linux reports KiB
+
+
+# ==================== STARTUP ====================
+def timed_process(command, env: dict) -> dict:
+    # Wall time and peak RSS of one child process (os.wait4 gives that child's own rusage)
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **env},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = proc.stderr.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{stderr.decode(errors='replace')}")
+    return {"seconds": round(time.perf_counter() - start, 3), "max_rss_mb": max_rss_mb(usage)}
+
+
+def bench_startup(env: dict, workers: int) -> dict:
+    # cold: first ingest into an empty index, then the first server boot.
+    # warm: re-ingest of an unchanged PDF (chunk store + manifest hits), then a restart.
+    ingest = [sys.executable, "ingest.py", "--backend", "fake", "--workers", str(workers)]
+    serve = [sys.executable, "-c", "import app"]
+    return {
+        "cold_ingest": timed_process(ingest, env),
+        "cold_server": timed_process(serve, env),
+        "warm_ingest": timed_process(ingest, env),
+        "warm_server": timed_process(serve, env),
+    }
+
+
+# ==================== INGESTION STAGES ====================
+def bench_ingest(pdf_path: str, workdir: str, repeat: int) -> dict:
+    # Imported late: config reads the environment that run() has just pointed at the fakes
+    import config
+    from pypdf import PdfReader
+    from langchain_core.documents import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from providers import make_embeddings, embedding_model
+    from embedding_cache import CachedEmbeddings
+    from fakes import FakeVectorStore
+
+    start = time.perf_counter()
+    reader = PdfReader(pdf_path)
+    pages = [Document(page_content=page.extract_text(extraction_mode="plain").strip(), metadata={"page": i})
+             for i, page in enumerate(reader.pages)]
+    load_seconds = time.perf_counter() - start
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        docs = splitter.split_documents(pages)
+    split_seconds = (time.perf_counter() - start) / repeat
+
+    texts = [doc.page_content for doc in docs]
+    # The startup stage filled INDEX_DIR's SQLite cache with these chunks: time a fresh, memory-only
+    # cache instead, so every chunk goes through the (fake) provider as on a first ingest
+    embeddings = CachedEmbeddings(make_embeddings().inner, model=embedding_model(), db_path=None)
+    start = time.perf_counter()
+    embeddings.embed_documents(texts)
+    embed_seconds = time.perf_counter() - start
+
+    # The memory tier has every chunk by now, so this is the store's own write cost
+    store = FakeVectorStore(embeddings, path=os.path.join(workdir, "upsert"))
+    start = time.perf_counter()
+    store.add_texts(texts, metadatas=[doc.metadata for doc in docs])
+    upsert_seconds = time.perf_counter() - start
+
+    return {
+        "pages": len(pages),
+        "chunks": len(docs),
+        "pdf_load_s": round(load_seconds, 4),
+        "split_s": round(split_seconds, 4),
+        "split_chunks_per_sec": round(len(docs) / max(split_seconds, 1e-9), 1),
+        "embed_s": round(embed_seconds, 4),
+        "embed_chunks_per_sec": round(len(docs) / max(embed_seconds, 1e-9), 1),
+        "upsert_s": round(upsert_seconds, 4),
+    }
+
+
+# ==================== QUERY LATENCY ====================
+def bench_queries(questions, levels, requests: int, warmup: int, unique: bool) -> list:
+    with redirect_stdout(sys.stderr):  # keep the boot banner out of the JSON on stdout
+        import rag
+
+    def ask(i: int) -> float:
+        question = questions[i % len(questions)]
+        if unique:
+            question = f"{question} (#{i})"  # defeat the answer cache
+        start = time.perf_counter()
+        answer = rag.get_answer(question)
+        if answer.startswith("⚠️"):
+            raise RuntimeError(answer)
+        return time.perf_counter() - start
+
+    results, offset = [], 0
+    for concurrency in levels:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(ask, range(offset, offset + warmup)))
+            offset += warmup
+            start = time.perf_counter()
+            latencies = list(pool.map(ask, range(offset, offset + requests)))
+            elapsed = time.perf_counter() - start
+            offset += requests
+        results.append({
+            "concurrency": concurrency,
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 1),
+            "p50_ms": round(1000 * percentile(latencies, 0.50), 2),
+            "p95_ms": round(1000 * percentile(latencies, 0.95), 2),
+            "p99_ms": round(1000 * percentile(latencies, 0.99), 2),
+        })
+        print(json.dumps(results[-1]), file=sys.stderr, flush=True)
+    return results
+
+
+def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    env = bench_env(args, workdir)
+    try:
+        print("⏱️ Startup (cold / warm)...", file=sys.stderr, flush=True)
+        startup = bench_startup(env, args.workers)
+        # The remaining stages run in this process, on the index the startup stage built
+        os.environ.update(env)
+        print("⏱️ Ingestion stages...", file=sys.stderr, flush=True)
+        ingest = bench_ingest(env["PDF_PATH"], workdir, args.split_repeat)
+        ingest_rss = max_rss_mb(resource.getrusage(resource.RUSAGE_SELF))
+        print("⏱️ get_answer concurrency sweep...", file=sys.stderr, flush=True)
+        questions = DEFAULT_QUESTIONS
+        if args.questions:
+            with open(args.questions, "r", encoding="utf-8") as f:
+                questions = [line.strip() for line in f if line.strip()]
+        queries = bench_queries(questions, args.concurrency, args.requests, args.warmup, not args.cached)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "pdf": os.path.basename(args.pdf),
+            "latency_ms": {"embed": args.embed_ms, "search": args.search_ms, "ttft": args.ttft_ms,
+                           "token": args.token_ms, "jitter": args.jitter_ms},
+        },
+        "startup": startup,
+        "ingest": ingest,
+        "queries": queries,
+        "memory": {
+            "after_ingest_max_rss_mb": ingest_rss,
+            "max_rss_mb": max_rss_mb(resource.getrusage(resource.RUSAGE_SELF)),
+        },
+    }
+
+
+# ==================== COMPARISON ====================
+def flatten(results: dict) -> dict:
+    # {"startup.cold_ingest.seconds": 1.2, "queries.c8.p95_ms": 40.1, ...}; meta is not a metric
+    metrics = {}
+    for section, value in results.items():
+        if section == "meta":
+            continue
+        if section == "queries":
+            value = {f"c{level['concurrency']}": level for level in value}
+        for name, item in value.items():
+            for key, number in (item.items() if isinstance(item, dict) else [(None, item)]):
+                if isinstance(number, (int, float)) and (key or name) not in NOT_METRICS:
+                    metrics[".".join(part for part in (section, name, key) if part)] = number
+    return metrics
+
+
+def compare(base: dict, new: dict, tolerance: float) -> list:
+    base_metrics, new_metrics = flatten(base), flatten(new)
+    rows = []
+    for metric in base_metrics:
+        if metric not in new_metrics:
+            continue
+        before, after = base_metrics[metric], new_metrics[metric]
+        change = (after - before) / before if before else 0.0
+        worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+        rows.append({
+            "metric": metric,
+            "base": before,
+            "new": after,
+            "change": round(change, 4),
+            "regression": worse > tolerance,
+        })
+    return rows
+
+
+# ==================== MAIN ====================
+def main():
+    # python -m bench.suite run --out bench-new.json
+    # python -m bench.suite compare bench-main.json bench-new.json --tolerance 0.1
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmarks against the fake providers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("--pdf", default=os.path.join(BACKEND_DIR, "SQL-Manual.pdf"))
+    run_parser.add_argument("--out", help="results file (default: stdout)")
+    run_parser.add_argument("--workers", type=int, default=0, help="ingest parsing processes (0 = one per core)")
+    run_parser.add_argument("--split-repeat", type=int, default=3, help="splitter passes to average")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    run_parser.add_argument("--requests", type=int, default=200, help="timed get_answer calls per level")
+    run_parser.add_argument("--warmup", type=int, default=20, help="untimed calls before each level")
+    run_parser.add_argument("--questions", help="text file with one question per line")
+    run_parser.add_argument("--cached", action="store_true", help="repeat questions, so the answer cache serves them")
+    run_parser.add_argument("--embed-ms", type=float, default=30.0, help="injected embedding request latency")
+    run_parser.add_argument("--search-ms", type=float, default=20.0, help="injected vector search latency")
+    run_parser.add_argument("--ttft-ms", type=float, default=150.0, help="injected LLM time to first token")
+    run_parser.add_argument("--token-ms", type=float, default=2.0, help="injected LLM time per output token")
+    run_parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +- jitter on every latency")
+
+    compare_parser = commands.add_parser("compare", help="diff two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--tolerance", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=1)
+        else:
+            json.dump(results, sys.stdout, indent=1)
+            print()
+        return
+
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    rows = compare(base, new, args.tolerance)
+    for row in rows:
+        json.dump(row, sys.stdout)
+        print()
+    regressions = [row["metric"] for row in rows if row["regression"]]
+    print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions) or '-'}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import glob
+import json
+import mmap
+import struct
+import hashlib
+
+from langchain_core.documents import Document
+
+# File layout: MAGIC | <count, metadata_len> | (count + 1) uint64 offsets | metadata JSON | utf-8 text blob
+MAGIC = b"SQLCHNK1"
+HEADER = struct.Struct("<QQ")
+
+
+# ==================== CACHE KEY ====================
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def params_key(splitter_params: dict) -> str:
+    return hashlib.sha256(json.dumps(splitter_params, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def store_path(cache_dir: str, pdf_path: str, splitter_params: dict) -> str:
+    # {stem}-{splitter params}-{PDF content}.bin: a new version of the PDF only replaces its own params' store
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{params_key(splitter_params)}-{file_sha256(pdf_path)[:24]}.bin")
+
+
+# ==================== READ / WRITE ====================
+def save_chunks(path: str, docs) -> None:
+    texts = [doc.page_content.encode("utf-8") for doc in docs]
+    metadata = json.dumps([doc.metadata for doc in docs], ensure_ascii=False, default=str).encode("utf-8")
+
+    offsets = [0]
+    for text in texts:
+        offsets.append(offsets[-1] + len(text))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(len(texts), len(metadata)))
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.write(metadata)
+        f.writelines(texts)
+    os.replace(tmp_path, path)
+
+
+def load_chunks(path: str):
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        if buf[:len(MAGIC)] != MAGIC:
+            return None
+        pos = len(MAGIC)
+        count, metadata_len = HEADER.unpack_from(buf, pos)
+        pos += HEADER.size
+        offsets = struct.unpack_from(f"<{count + 1}Q", buf, pos)
+        pos += 8 * (count + 1)
+        metadata = json.loads(buf[pos:pos + metadata_len].decode("utf-8"))
+        blob = pos + metadata_len
+        return [
+            Document(page_content=buf[blob + offsets[i]:blob + offsets[i + 1]].decode("utf-8"), metadata=metadata[i])
+            for i in range(count)
+        ]
+
+
+# ==================== LOAD OR BUILD ====================
+def load_or_build(pdf_path: str, splitter_params: dict, build, cache_dir: str):
+    """Return cached chunks for this exact PDF + splitter config, parsing only on a miss."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = store_path(cache_dir, pdf_path, splitter_params)
+
+    docs = load_chunks(path)
+    if docs is not None:
+        print(f"⚡ Loaded {len(docs)} cached chunks from {path}")
+        return docs
+
+    docs = build()
+    save_chunks(path, docs)
+    # Drop stores of older versions of this PDF with the same splitter settings (and pre-params-key
+    # stores); other settings keep theirs, so switching back and forth stays a cache hit
+    stem = glob.escape(os.path.splitext(os.path.basename(pdf_path))[0])
+    patterns = [f"{stem}-{params_key(splitter_params)}-{'?' * 24}.bin", f"{stem}-{'?' * 24}.bin"]
+    for stale in (found for pattern in patterns for found in glob.glob(os.path.join(cache_dir, pattern))):
+        if stale != path:
+            os.remove(stale)
+    return docs
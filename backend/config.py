@@ -0,0 +1,113 @@
+import os
+from dotenv import load_dotenv
+
+# ==================== LOAD ENVIRONMENT VARIABLES ====================
+load_dotenv()
+COHERE_API_KEY = os.getenv("COHERE_API_KEY")
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+OFFLINE = os.getenv("OFFLINE", "0") == "1"  # default every provider to its local fake (see fakes.py)
+
+# ==================== LOCAL ARTIFACTS ====================
+INDEX_DIR = os.getenv("INDEX_DIR", ".index")
+
+# ==================== MODELS ====================
+EMBEDDING_MODEL = "embed-english-v3.0"
+LLM_MODEL = "llama-3.1-8b-instant"
+
+# ==================== RETRIEVAL ====================
+TOP_K = int(os.getenv("TOP_K", "3"))
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")  # "hybrid" (BM25 + dense, RRF) or "dense"
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))  # per retriever, before fusion
+CORPUS_PATH = os.path.join(INDEX_DIR, "corpus.bin")  # chunks (with chunk_id) the local indexes point into
+SPARSE_INDEX_DIR = os.path.join(INDEX_DIR, "sparse")
+KEYWORD_INDEX_PATH = os.path.join(INDEX_DIR, "keywords.json")
+KEYWORD_LOOKUP = os.getenv("KEYWORD_LOOKUP", "1") == "1"  # answer "syntax of X" from the keyword index, no embedding
+
+# ==================== RERANKING ====================
+RERANK = os.getenv("RERANK", "0") == "1"  # needs onnxruntime + tokenizers
+RERANK_MODEL = os.getenv("RERANK_MODEL", "Xenova/ms-marco-MiniLM-L-6-v2")  # HF repo id or a local directory
+RERANK_MODEL_FILE = os.getenv("RERANK_MODEL_FILE", "onnx/model_quantized.onnx")  # int8 weights, ~23 MB
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))  # over-fetched, then cut to TOP_K
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))  # past this, keep vector order
+RERANK_MAX_LENGTH = int(os.getenv("RERANK_MAX_LENGTH", "256"))  # tokens per (query, chunk) pair
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "10000"))  # cached (query, chunk) scores
+RERANK_THREADS = int(os.getenv("RERANK_THREADS", "0"))  # 0 = onnxruntime default
+
+# ==================== PROMPT CONTEXT ====================
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1024"))  # estimated tokens of retrieved text, 0 = no limit
+
+# ==================== ADMISSION CONTROL ====================
+# Queries beyond the limit wait in a bounded queue; overflow gets 429, a missed queue deadline 503
+MAX_CONCURRENT_QUERIES = int(os.getenv("MAX_CONCURRENT_QUERIES", "16"))  # per process; 0 = unlimited
+MAX_QUEUED_QUERIES = int(os.getenv("MAX_QUEUED_QUERIES", "32"))
+QUEUE_TIMEOUT = float(os.getenv("QUEUE_TIMEOUT", "5"))  # seconds a query may wait for a slot
+
+# ==================== BATCH QUERIES ====================
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "256"))
+BATCH_SEARCH_CONCURRENCY = int(os.getenv("BATCH_SEARCH_CONCURRENCY", "16"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))  # stay under Groq rate limits
+
+# ==================== EMBEDDING CACHE ====================
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(INDEX_DIR, "embeddings.sqlite"))
+EMBEDDING_CACHE_MB = int(os.getenv("EMBEDDING_CACHE_MB", "64"))  # in-memory LRU budget, 0 disables it
+
+# ==================== ANSWER CACHE ====================
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))  # cosine similarity of query embeddings
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))  # 0 disables it
+
+# ==================== VECTOR STORE ====================
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "fake" if OFFLINE else "pinecone")  # "pinecone", "local" or "fake"
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(INDEX_DIR, "local"))
+LOCAL_MANIFEST_PATH = os.path.join(LOCAL_INDEX_DIR, "manifest.json")
+LOCAL_QUANTIZATION = os.getenv("LOCAL_QUANTIZATION", "none")  # "none" (float32), "int8" or "binary"
+LOCAL_RESCORE_FACTOR = int(os.getenv("LOCAL_RESCORE_FACTOR", "0"))  # shortlist = k * factor; 0 = per-mode default
+LOCAL_INDEX_TYPE = os.getenv("LOCAL_INDEX_TYPE", "flat")  # "flat" (exact) or "ivf" (approximate, for many manuals)
+LOCAL_IVF_NLIST = int(os.getenv("LOCAL_IVF_NLIST", "0"))  # IVF lists; 0 = 4 * sqrt(corpus size)
+LOCAL_IVF_NPROBE = int(os.getenv("LOCAL_IVF_NPROBE", "8"))  # lists scanned per query: the recall / latency knob
+
+# ==================== FAKE PROVIDERS ====================
+# Deterministic stand-ins for Cohere / Pinecone / Groq, for benchmarks and air-gapped CI
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "fake" if OFFLINE else "cohere")  # "cohere" or "fake"
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "fake" if OFFLINE else "groq")  # "groq" or "fake"
+FAKE_SEED = int(os.getenv("FAKE_SEED", "0"))  # seeds the injected jitter
+FAKE_EMBEDDING_DIM = int(os.getenv("FAKE_EMBEDDING_DIM", "256"))
+FAKE_EMBED_LATENCY_MS = float(os.getenv("FAKE_EMBED_LATENCY_MS", "0"))  # per embedding request
+FAKE_EMBED_JITTER_MS = float(os.getenv("FAKE_EMBED_JITTER_MS", "0"))
+FAKE_INDEX_DIR = os.getenv("FAKE_INDEX_DIR", os.path.join(INDEX_DIR, "fake"))  # VECTOR_BACKEND=fake
+FAKE_SEARCH_LATENCY_MS = float(os.getenv("FAKE_SEARCH_LATENCY_MS", "0"))  # per vector store call
+FAKE_SEARCH_JITTER_MS = float(os.getenv("FAKE_SEARCH_JITTER_MS", "0"))
+FAKE_LLM_MODE = os.getenv("FAKE_LLM_MODE", "echo")  # "echo" (the question) or "template"
+FAKE_LLM_TEMPLATE = os.getenv("FAKE_LLM_TEMPLATE", "Answer to {question!r} from {context_chars} characters of context.")
+FAKE_LLM_TTFT_MS = float(os.getenv("FAKE_LLM_TTFT_MS", "0"))  # before the first token
+FAKE_LLM_TOKEN_MS = float(os.getenv("FAKE_LLM_TOKEN_MS", "0"))  # between tokens
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "0"))  # on both
+
+# ==================== PINECONE ====================
+INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "pdf-chat-index")
+PINECONE_HOST = os.getenv("PINECONE_HOST")  # set it to skip the describe_index lookup at boot
+PINECONE_CLOUD = os.getenv("PINECONE_CLOUD", "aws")
+PINECONE_REGION = os.getenv("PINECONE_REGION", "us-east-1")
+
+# ==================== INGESTION ====================
+PDF_PATH = os.getenv("PDF_PATH", "SQL-Manual.pdf")
+CORPUS_REGISTRY = os.getenv("CORPUS_REGISTRY", "corpus.json")  # manuals + dialects to ingest; else PDF_PATH alone
+DOCUMENTS_PATH = os.path.join(INDEX_DIR, "documents.json")  # the registry as last ingested, read by the server
+INGEST_PARAMS_PATH = os.path.join(INDEX_DIR, "ingest.json")  # ingest.py's --registry / --pdf / --splitter, reused by reloads
+SPLITTER = os.getenv("SPLITTER", "recursive")  # "recursive" (1000/200 chars) or "structured" (section-aligned)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+STRUCTURED_MAX_CHARS = int(os.getenv("STRUCTURED_MAX_CHARS", "1500"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0"))  # 0 = one per CPU core
+MANIFEST_PATH = os.path.join(INDEX_DIR, "manifest.json")
+CHUNK_CACHE_DIR = os.path.join(INDEX_DIR, "chunks")
+EVAL_CHUNK_CACHE_DIR = os.path.join(INDEX_DIR, "eval-chunks")  # bench.eval grids, kept apart from the serving corpus
+
+# ==================== HOT RELOAD ====================
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # required by POST /admin/reindex; unset = endpoint disabled
+RELOAD_WATCH = os.getenv("RELOAD_WATCH", "0") == "1"  # reindex when the registry or a PDF changes on disk
+RELOAD_WATCH_INTERVAL = float(os.getenv("RELOAD_WATCH_INTERVAL", "10"))  # seconds between polls (and debounce)
+RELOAD_WORKERS = int(os.getenv("RELOAD_WORKERS", "2"))  # parsing processes (in a child ingest.py); 1 = parse in-process
+RELOAD_DRAIN_TIMEOUT = float(os.getenv("RELOAD_DRAIN_TIMEOUT", "120"))  # wait for old queries before deleting vectors
+RELOAD_LOCK_PATH = os.path.join(INDEX_DIR, "reload.lock")
@@ -0,0 +1,90 @@
+import re
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+MIN_OVERLAP_CHARS = 20  # shorter shared edges are coincidence, not splitter overlap
+MIN_PARTIAL_TOKENS = 64  # don't bother truncating a block into a smaller gap than this
+
+
+# ==================== TOKEN ESTIMATE ====================
+def estimate_tokens(text: str) -> int:
+    # Local stand-in for the Llama tokenizer: one token per word or symbol, long identifiers
+    # (row_number, varchar2) split every ~6 characters. Close enough for budgeting, no model download.
+    return sum(1 + (len(word) - 1) // 6 for word in WORD_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    words = [match.end() for match in WORD_RE.finditer(text)]
+    low, high = 0, len(words)
+    while low < high:  # longest word prefix that fits
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:words[mid - 1]]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:words[low - 1]] if low else ""
+
+
+# ==================== OVERLAP MERGING ====================
+def overlap_length(left: str, right: str, max_overlap: int) -> int:
+    # Longest suffix of `left` that is a prefix of `right` (the splitter's chunk_overlap)
+    for size in range(min(len(left), len(right), max_overlap), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def merge_page_texts(texts, max_overlap: int):
+    # Chunks of one page: drop contained ones, stitch neighbours that share an overlap
+    pieces = []
+    for text in texts:
+        if any(text in piece for piece in pieces):
+            continue
+        pieces = [piece for piece in pieces if piece not in text]
+        pieces.append(text)
+
+    merged = True
+    while merged:
+        merged = False
+        for i, left in enumerate(pieces):
+            for j, right in enumerate(pieces):
+                size = overlap_length(left, right, max_overlap) if i != j else 0
+                if size:
+                    pieces[i] = left + right[size:]
+                    del pieces[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return pieces
+
+
+# ==================== CONTEXT ASSEMBLY ====================
+def build_context(docs, token_budget: int, max_overlap: int = 400) -> str:
+    """Join retrieved chunks into at most `token_budget` estimated tokens.
+
+    Chunks from the same page are merged into one block (overlapping spans kept once) and blocks
+    keep the rank of their best chunk. The first block that doesn't fit is truncated into the
+    remaining room and ends the context.
+    """
+    pages = {}
+    for doc in docs:
+        key = (doc.metadata.get("source"), doc.metadata.get("page"), doc.metadata.get("section"))
+        pages.setdefault(key, []).append(doc.page_content.strip())
+    blocks = ["\n".join(merge_page_texts(texts, max_overlap)) for texts in pages.values()]
+    if token_budget <= 0:
+        return "\n\n".join(blocks)
+
+    context, remaining = [], token_budget
+    for block in blocks:
+        tokens = estimate_tokens(block)
+        if tokens <= remaining:
+            context.append(block)
+            remaining -= tokens
+        else:
+            context.append(truncate_to_tokens(block, remaining))
+            break
+        if remaining < MIN_PARTIAL_TOKENS:
+            break
+    return "\n\n".join(context)
@@ -0,0 +1,89 @@
+import os
+import re
+import json
+
+DEFAULT_DIALECT = "generic"
+FILTER_FIELDS = ("document", "dialect")  # chunk metadata fields a query can be restricted to
+
+
+# ==================== REGISTRY ====================
+def document_id(path: str) -> str:
+    # "SQL-Manual.pdf" -> "sql-manual"
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"[^a-z0-9]+", "-", stem.lower()).strip("-") or "document"
+
+
+def load_registry(path: str, default_pdf: str):
+    """Manuals in the corpus: [{"id", "path", "dialect", "title"}].
+
+    Read from a JSON file like {"documents": [{"path": "postgres.pdf", "dialect": "postgres"}, ...]};
+    without one (or with path=None), the corpus is just `default_pdf`.
+    """
+    entries = [{"path": default_pdf}]
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)["documents"]
+
+    registry, seen = [], set()
+    for entry in entries:
+        entry = {
+            "id": entry.get("id") or document_id(entry["path"]),
+            "path": entry["path"],
+            "dialect": (entry.get("dialect") or DEFAULT_DIALECT).lower(),
+            "title": entry.get("title") or os.path.basename(entry["path"]),
+        }
+        if entry["id"] in seen:
+            raise ValueError(f"Duplicate document id in {path}: {entry['id']}")
+        seen.add(entry["id"])
+        registry.append(entry)
+    return registry
+
+
+def save_registry(path: str, registry) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"documents": registry}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def partition_metadata(entry: dict) -> dict:
+    # Stamped on every chunk of the document; the vector stores filter on it
+    return {"document": entry["id"], "dialect": entry["dialect"]}
+
+
+# ==================== FILTERS ====================
+def parse_filter(registry, data: dict):
+    """(filter, error) from a request body's optional "document" / "dialect" fields.
+
+    The filter uses Pinecone's metadata syntax ({"dialect": "postgres"}), so it can be passed to the
+    vector store as-is. Unknown values are rejected rather than silently matching nothing.
+    """
+    result = {}
+    for field in FILTER_FIELDS:
+        value = (data or {}).get(field)
+        if value is None or value == "":
+            continue
+        known = {entry["id" if field == "document" else field] for entry in registry}
+        canonical = {v.lower(): v for v in known}.get(value.lower()) if isinstance(value, str) else None
+        if canonical is None:
+            return None, f"Unknown {field}: {value!r} (known: {', '.join(sorted(known))})"
+        result[field] = canonical
+    return result or None, None
+
+
+def matches(metadata: dict, filter: dict) -> bool:
+    # The subset of Pinecone's filter syntax used here: {"field": value} or {"field": {"$in": [...]}}
+    for field, condition in filter.items():
+        value = metadata.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def filter_key(filter) -> str:
+    return json.dumps(filter, sort_keys=True) if filter else ""
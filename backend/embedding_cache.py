@@ -0,0 +1,192 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+
+from langchain_core.embeddings import Embeddings
+
+DOCUMENT = "search_document"
+QUERY = "search_query"
+EMBED_BATCH_SIZE = 96  # Cohere's per-request limit
+
+
+# ==================== IN-MEMORY TIER ====================
+class LRUBytesCache:
+    """LRU of float32 blobs bounded by total byte size rather than entry count."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            blob = self._items.get(key)
+            if blob is not None:
+                self._items.move_to_end(key)
+            return blob
+
+    def put(self, key, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.used_bytes -= len(old)
+            self._items[key] = blob
+            self.used_bytes += len(blob)
+            while self.used_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.used_bytes -= len(evicted)
+
+
+# ==================== PERSISTENT TIER ====================
+class SQLiteVectorCache:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # readers in other workers don't block writers
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT, input_type TEXT, text_hash BLOB, vector BLOB,"
+            " PRIMARY KEY (model, input_type, text_hash)) WITHOUT ROWID"
+        )
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND input_type = ? AND text_hash = ?", key
+                ).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+        return found
+
+    def put_many(self, items) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, input_type, text_hash, vector) VALUES (?, ?, ?, ?)",
+                [(*key, blob) for key, blob in items],
+            )
+            self._conn.execute("COMMIT")
+
+
+# ==================== CACHED EMBEDDINGS ====================
+def to_blob(vector) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def from_blob(blob: bytes):
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Two-tier (memory LRU -> SQLite) cache in front of a LangChain embeddings client."""
+
+    def __init__(self, inner: Embeddings, model: str, db_path: str = None, memory_bytes: int = 64 << 20):
+        self.inner = inner
+        self.model = model
+        self.memory = LRUBytesCache(memory_bytes) if memory_bytes > 0 else None
+        self.disk = SQLiteVectorCache(db_path) if db_path else None
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, input_type: str, text: str):
+        return (self.model, input_type, hashlib.sha256(text.encode("utf-8")).digest())
+
+    def _lookup(self, input_type: str, texts):
+        keys = [self._key(input_type, text) for text in texts]
+        blobs = {}
+        if self.memory is not None:
+            for key in keys:
+                blob = self.memory.get(key)
+                if blob is not None:
+                    blobs[key] = blob
+        if self.disk is not None:
+            missing = [key for key in dict.fromkeys(keys) if key not in blobs]
+            for key, blob in self.disk.get_many(missing).items():
+                blobs[key] = blob
+                if self.memory is not None:
+                    self.memory.put(key, blob)
+        # Each distinct missing text is embedded once, even if it repeats in the batch
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in blobs:
+                misses.setdefault(key, text)
+        self.hits += len(keys) - len(misses)
+        self.misses += len(misses)
+        return keys, blobs, misses
+
+    def _store(self, blobs, misses, vectors) -> None:
+        new = [(key, to_blob(vector)) for key, vector in zip(misses, vectors)]
+        if self.disk is not None and new:
+            self.disk.put_many(new)
+        for key, blob in new:
+            blobs[key] = blob
+            if self.memory is not None:
+                self.memory.put(key, blob)
+
+    def _embed(self, input_type: str, texts, compute):
+        keys, blobs, misses = self._lookup(input_type, texts)
+        if misses:
+            self._store(blobs, misses, compute(list(misses.values())))
+        return [from_blob(blobs[key]) for key in keys]
+
+    async def _aembed(self, input_type: str, texts, compute):
+        keys, blobs, misses = self._lookup(input_type, texts)
+        if misses:
+            self._store(blobs, misses, await compute(list(misses.values())))
+        return [from_blob(blobs[key]) for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed(DOCUMENT, texts, self.inner.embed_documents)
+
+    def embed_query(self, text: str):
+        return self._embed(QUERY, [text], lambda missing: [self.inner.embed_query(missing[0])])[0]
+
+    def embed_queries(self, texts):
+        # Many queries per request (Cohere's embed() takes an input_type); fall back to one call each
+        def compute(missing):
+            if not hasattr(self.inner, "embed"):
+                return [self.inner.embed_query(text) for text in missing]
+            vectors = []
+            for start in range(0, len(missing), EMBED_BATCH_SIZE):
+                vectors += self.inner.embed(missing[start:start + EMBED_BATCH_SIZE], input_type=QUERY)
+            return vectors
+        return self._embed(QUERY, texts, compute)
+
+    async def aembed_documents(self, texts):
+        return await self._aembed(DOCUMENT, texts, self.inner.aembed_documents)
+
+    async def aembed_query(self, text: str):
+        async def compute(missing):
+            return [await self.inner.aembed_query(missing[0])]
+        return (await self._aembed(QUERY, [text], compute))[0]
+
+    async def aembed_queries(self, texts):
+        async def compute(missing):
+            if not hasattr(self.inner, "aembed"):
+                return [await self.inner.aembed_query(text) for text in missing]
+            vectors = []
+            for start in range(0, len(missing), EMBED_BATCH_SIZE):
+                vectors += await self.inner.aembed(missing[start:start + EMBED_BATCH_SIZE], input_type=QUERY)
+            return vectors
+        return await self._aembed(QUERY, texts, compute)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "memory_bytes": self.memory.used_bytes if self.memory is not None else 0,
+        }
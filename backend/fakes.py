@@ -0,0 +1,177 @@
+import re
+import time
+import random
+import asyncio
+import hashlib
+import threading
+
+import numpy as np
+from pydantic import ConfigDict
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from local_store import LocalVectorStore
+
+# Deterministic offline stand-ins for Cohere, Pinecone and Groq (EMBEDDING_PROVIDER / VECTOR_BACKEND /
+# LLM_PROVIDER = "fake"), so the server, splitter and context assembly can be profiled without keys
+# or network variance. Injected latencies are seeded, so two runs see the same delays.
+
+FEATURE_RE = re.compile(r"[a-z0-9_]+")
+TOKEN_RE = re.compile(r"\S+\s*")
+
+
+# ==================== INJECTED LATENCY ====================
+class Latency:
+    """A delay of `mean_ms` +- `jitter_ms` (uniform), drawn from a seeded generator."""
+
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def seconds(self) -> float:
+        if not self.jitter_ms:
+            return self.mean_ms / 1000
+        with self._lock:
+            offset = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.mean_ms + offset) / 1000
+
+    def sleep(self) -> None:
+        delay = self.seconds()
+        if delay:
+            time.sleep(delay)
+
+    async def asleep(self) -> None:
+        delay = self.seconds()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+# ==================== EMBEDDINGS ====================
+class HashedEmbeddings(Embeddings):
+    """Feature hashing over words and word bigrams: texts that share terms get similar vectors,
+    so retrieval behaves plausibly, and the same text always embeds the same way.
+
+    `latency` is paid once per call, like one batched request to the embedding API.
+    """
+
+    def __init__(self, dim: int = 256, latency: Latency = None):
+        self.dim = dim
+        self.latency = latency or Latency()
+
+    def _vector(self, text: str):
+        words = FEATURE_RE.findall(text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0  # signed, so collisions cancel out
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        self.latency.sleep()
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str):
+        return self.embed_documents([text])[0]
+
+    def embed(self, texts, input_type: str = None):
+        # Same shape as CohereEmbeddings.embed, so CachedEmbeddings batches queries the same way
+        return self.embed_documents(texts)
+
+    async def aembed_documents(self, texts):
+        await self.latency.asleep()
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str):
+        return (await self.aembed_documents([text]))[0]
+
+    async def aembed(self, texts, input_type: str = None):
+        return await self.aembed_documents(texts)
+
+
+# ==================== VECTOR STORE ====================
+class FakeVectorStore(LocalVectorStore):
+    """The in-process store plus a Pinecone-like round trip on every search and write."""
+
+    def __init__(self, embedding, path: str = None, latency: Latency = None, **kwargs):
+        super().__init__(embedding, path=path, **kwargs)
+        self.latency = latency or Latency()
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        self.latency.sleep()
+        return super().add_texts(texts, metadatas=metadatas, ids=ids, **kwargs)
+
+    def delete(self, ids=None, **kwargs):
+        self.latency.sleep()
+        return super().delete(ids=ids, **kwargs)
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 4, filter: dict = None, **kwargs):
+        self.latency.sleep()
+        return super().similarity_search_by_vector_with_score(embedding, k, filter=filter, **kwargs)
+
+    def similarity_search_by_vectors(self, embeddings, k: int = 4, filter: dict = None, **kwargs):
+        self.latency.sleep()
+        return super().similarity_search_by_vectors(embeddings, k, filter=filter, **kwargs)
+
+    async def asimilarity_search_by_vector(self, embedding, k: int = 4, **kwargs):
+        # The wait happens on the event loop, like a real network call, not in an executor thread
+        await self.latency.asleep()
+        found = LocalVectorStore.similarity_search_by_vector_with_score(self, embedding, k, **kwargs)
+        return [doc for doc, _ in found]
+
+
+# ==================== LLM ====================
+class FakeChatModel(BaseChatModel):
+    """Answers without a model: mode="echo" repeats the question, mode="template" fills `template`
+    with {question}, {context_chars} and {prompt_chars}.
+
+    Streaming waits `ttft` before the first token and `per_token` between tokens; a non-streaming
+    call waits for the whole answer, like the real API.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    mode: str = "echo"
+    template: str = "Answer to {question!r} from {context_chars} characters of context."
+    ttft: Latency = Latency()
+    per_token: Latency = Latency()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer(self, messages) -> list:
+        prompt = str(messages[-1].content)
+        question = prompt.rsplit("Question:", 1)[-1].split("Answer:", 1)[0].strip()
+        if self.mode == "echo":
+            text = question
+        elif self.mode == "template":
+            context = prompt.split("Context:", 1)[-1].split("Question:", 1)[0].strip()
+            text = self.template.format(question=question, context_chars=len(context), prompt_chars=len(prompt))
+        else:
+            raise ValueError(f"Unknown fake LLM mode: {self.mode}")
+        return TOKEN_RE.findall(text) or [""]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._answer(messages)
+        time.sleep(self.ttft.seconds() + sum(self.per_token.seconds() for _ in tokens[1:]))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._answer(messages)
+        await asyncio.sleep(self.ttft.seconds() + sum(self.per_token.seconds() for _ in tokens[1:]))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, token in enumerate(self._answer(messages)):
+            (self.per_token if i else self.ttft).sleep()
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, token in enumerate(self._answer(messages)):
+            await (self.per_token if i else self.ttft).asleep()
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
@@ -0,0 +1,200 @@
+import os
+import sys
+import time
+import fcntl
+import threading
+import traceback
+import subprocess
+from contextlib import contextmanager
+
+import config
+import rag
+from providers import make_vectorstore, embedding_model, vector_index_name, manifest_path
+from ingestion import sync_index, flush_deletes, load_manifest
+from ingest import load_corpus, build_lookup_indexes, load_ingest_params
+from corpus_registry import load_registry
+from live_corpus import LiveCorpus
+
+# ==================== RELOAD STATUS ====================
+# One reload at a time per process; a trigger during a reload queues exactly one more
+_status_lock = threading.Lock()
+status = {"state": "idle", "reason": None, "queued": False, "started": None, "finished": None,
+          "seconds": None, "error": None, "last": None}
+
+
+@contextmanager
+def reload_lock():
+    # Serialises reloads across gunicorn workers: the first one embeds, the others find the manifest current
+    os.makedirs(os.path.dirname(config.RELOAD_LOCK_PATH) or ".", exist_ok=True)
+    with open(config.RELOAD_LOCK_PATH, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ==================== REINDEX ====================
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def corpus_source():
+    # (registry path or None, default PDF, splitter): what ingest.py last built the index from
+    params = load_ingest_params()
+    return params["registry"], params["pdf"], params["splitter"]
+
+
+def parse_corpus(registry_path, pdf_path: str, splitter: str, registry):
+    # Parsing fans out to worker processes. Forked from this multithreaded server they could inherit a
+    # lock another thread holds, and spawned ones would re-import a script-launched app, so a fresh
+    # single-threaded `ingest.py --parse-only` parses into the chunk store and the chunks are read from there
+    if config.RELOAD_WORKERS != 1:
+        source = ["--registry", registry_path] if registry_path else ["--pdf", pdf_path]
+        command = [sys.executable, "ingest.py", "--parse-only", "--splitter", splitter,
+                   "--workers", str(config.RELOAD_WORKERS)] + source
+        if subprocess.run(command, cwd=BACKEND_DIR, env={**os.environ, "PDF_PATH": pdf_path}).returncode:
+            print("⚠️ Parsing process failed, parsing in the server process instead")
+    return load_corpus(registry, 1, splitter)  # chunk store hits after a successful parse
+
+
+# Retired corpora that may still read vectors a deferred (Pinecone) sync left for deletion
+_retired = []
+_retired_lock = threading.Lock()
+
+
+def flush_retired(store):
+    # Deletes the pending vectors once no retired corpus has queries left; None while one still does
+    # (its own drain flushes). Under the reload lock, so no reload can add deletes mid-check.
+    with reload_lock():
+        with _retired_lock:
+            _retired[:] = [corpus for corpus in _retired if corpus.active]
+            if _retired:
+                return None
+        return flush_deletes(store, manifest_path())
+
+
+def _flush_after_drain(old, store) -> None:
+    old.wait_idle()
+    try:
+        deleted = flush_retired(store)
+    except Exception:
+        traceback.print_exc()
+        return
+    if deleted is not None:
+        print(f"🧹 Generation {old.generation} drained, {deleted} removed vectors deleted")
+
+
+def reindex() -> dict:
+    """Re-ingest the corpus registry and swap the server onto it without dropping a query.
+
+    Everything is built off to the side while `rag.live` keeps serving; the swap is one reference
+    assignment. Queries that already hold the old LiveCorpus finish on it, and vectors only the old
+    corpus can see (Pinecone deletes) are removed once it has drained, in the background if that
+    takes longer than RELOAD_DRAIN_TIMEOUT.
+    """
+    shared = config.VECTOR_BACKEND == "pinecone"
+    with reload_lock():
+        registry_path, pdf_path, splitter = corpus_source()
+        registry = load_registry(registry_path, pdf_path)
+        docs = parse_corpus(registry_path, pdf_path, splitter, registry)
+        # A reopened local store is a private copy, so the live one is untouched by the sync.
+        # Pinecone is shared by both corpora: new vectors go in now, removed ones wait for the drain.
+        store = rag.vectorstore if shared else make_vectorstore(rag.embeddings)
+        sync = sync_index(
+            docs, store, manifest_path(), vector_index_name(), embedding_model(), defer_deletes=shared,
+        )
+        sparse, keywords = build_lookup_indexes(registry, docs)
+
+        # Swapped inside the lock, so a concurrent flush_retired() already sees the old corpus as retired
+        old = rag.live
+        if shared:
+            with _retired_lock:
+                _retired.append(old)
+        rag.vectorstore = store
+        rag.live = LiveCorpus(registry, rag.make_retriever(store, sparse, keywords), rag.make_answer_cache, old.generation + 1)
+    print(f"♻️ Corpus generation {rag.live.generation} live: {', '.join(entry['id'] for entry in registry)}")
+
+    drained = old.wait_idle(config.RELOAD_DRAIN_TIMEOUT)
+    deleted = 0
+    if shared:
+        if drained:
+            deleted = flush_retired(store) or 0
+        else:
+            # Keep waiting off the reload thread; the deletes stay pending (see reload_status) until then
+            threading.Thread(target=_flush_after_drain, args=(old, store), name="corpus-drain", daemon=True).start()
+    return {**sync, "generation": rag.live.generation, "chunks": len(docs), "drained": drained, "deleted": deleted}
+
+
+def _run() -> None:
+    while True:
+        start = time.perf_counter()
+        try:
+            last, error = reindex(), None
+        except Exception as e:
+            traceback.print_exc()
+            last, error = None, str(e)
+        with _status_lock:
+            status.update(finished=time.time(), seconds=round(time.perf_counter() - start, 3), error=error)
+            if last is not None:
+                status["last"] = last
+            if not status["queued"]:
+                status["state"] = "idle"
+                return
+            status.update(queued=False, started=time.time(), finished=None, seconds=None, error=None)
+
+
+def start_reindex(reason: str = "admin") -> str:
+    # "started", or "queued" when a reload is already running (it reruns once afterwards)
+    with _status_lock:
+        if status["state"] == "running":
+            status["queued"] = True
+            return "queued"
+        status.update(state="running", reason=reason, started=time.time(), finished=None, seconds=None, error=None)
+    threading.Thread(target=_run, name="corpus-reload", daemon=True).start()
+    return "started"
+
+
+def reload_status() -> dict:
+    pending = len(load_manifest(manifest_path()).get("pending_deletes", []))
+    with _retired_lock:
+        draining = [corpus.generation for corpus in _retired if corpus.active]
+    with _status_lock:
+        return {**status, "generation": rag.live.generation, "pending_deletes": pending, "draining": draining}
+
+
+# ==================== FILE WATCHER ====================
+def corpus_signature():
+    # (path, mtime, size) of the registry and every PDF in it; None while the registry is mid-edit
+    registry_path, pdf_path, _ = corpus_source()
+    try:
+        registry = load_registry(registry_path, pdf_path)
+    except (ValueError, KeyError, OSError):
+        return None
+    signature = []
+    for path in ([registry_path] if registry_path else []) + [entry["path"] for entry in registry]:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def watch(interval: float) -> None:
+    # Polling, so it works on any filesystem; a change must hold still for one interval (debounce)
+    current = corpus_signature()
+    seen = current
+    while True:
+        time.sleep(interval)
+        signature = corpus_signature()
+        if signature is not None and signature == seen and signature != current:
+            current = signature
+            print(f"👀 Corpus changed on disk ({start_reindex('watch')} reload)")
+        seen = signature
+
+
+def start_watcher(interval: float = None) -> None:
+    interval = interval or config.RELOAD_WATCH_INTERVAL
+    threading.Thread(target=watch, args=(interval,), name="corpus-watch", daemon=True).start()
+    registry_path, pdf_path, _ = corpus_source()
+    print(f"👀 Watching the corpus ({registry_path or pdf_path}) every {interval:g}s")
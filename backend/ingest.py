@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import argparse
+
+from pinecone import Pinecone, ServerlessSpec
+
+import config
+from providers import make_embeddings, make_vectorstore, embedding_model, vector_index_name, manifest_path
+from chunk_store import load_or_build, save_chunks
+from pdf_loader import load_and_split_parallel
+from ingestion import sync_index
+from sparse_index import BM25Index
+from keyword_index import KeywordIndex
+from corpus_registry import load_registry, save_registry, partition_metadata
+
+
+# ==================== LOAD AND SPLIT PDF ====================
+def splitter_params(splitter: str) -> dict:
+    if splitter == "structured":
+        return {"splitter": "structured", "chunk_size": config.STRUCTURED_MAX_CHARS, "chunk_overlap": 0}
+    return {"splitter": "recursive", "chunk_size": config.CHUNK_SIZE, "chunk_overlap": config.CHUNK_OVERLAP}
+
+
+def load_docs(pdf_path: str, workers: int, splitter: str = config.SPLITTER):
+    params = splitter_params(splitter)
+
+    def load_and_split():
+        print(f"📄 Loading {pdf_path} ({splitter} splitter)...")
+        return load_and_split_parallel(
+            pdf_path, params["chunk_size"], params["chunk_overlap"], workers=workers, splitter=splitter,
+        )
+
+    # Warm runs read the chunk store (keyed by PDF hash + splitter params) and skip parsing
+    docs = load_or_build(pdf_path, params, load_and_split, config.CHUNK_CACHE_DIR)
+    print(f"✅ Loaded and split into {len(docs)} chunks")
+    return docs
+
+
+def load_corpus(registry, workers: int, splitter: str = config.SPLITTER):
+    # Every chunk is tagged with its document / dialect partition before hashing, so ids are per manual
+    docs = []
+    for entry in registry:
+        document_docs = load_docs(entry["path"], workers, splitter)
+        for doc in document_docs:
+            doc.metadata.update(partition_metadata(entry))
+        docs += document_docs
+    return docs
+
+
+# ==================== INGEST PARAMETERS ====================
+# What the index was built from, so a hot reload rebuilds the same corpus with the same chunking
+def save_ingest_params(registry_path, pdf_path: str, splitter: str) -> None:
+    params = {
+        "registry": os.path.abspath(registry_path) if registry_path else None,  # None: --pdf alone
+        "pdf": os.path.abspath(pdf_path),
+        "splitter": splitter,
+    }
+    tmp_path = f"{config.INGEST_PARAMS_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=1)
+    os.replace(tmp_path, config.INGEST_PARAMS_PATH)
+
+
+def load_ingest_params() -> dict:
+    # Falls back to the configured corpus for an index built before ingest.json existed
+    params = {"registry": config.CORPUS_REGISTRY, "pdf": config.PDF_PATH, "splitter": config.SPLITTER}
+    try:
+        with open(config.INGEST_PARAMS_PATH, "r", encoding="utf-8") as f:
+            params.update(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return params
+
+
+# ==================== LOOKUP INDEXES ====================
+def build_lookup_indexes(registry, docs):
+    # Local lookup indexes; built after sync so every chunk carries its chunk_id
+    save_registry(config.DOCUMENTS_PATH, registry)
+    save_chunks(config.CORPUS_PATH, docs)
+    sparse = BM25Index.build(docs)
+    sparse.save(config.SPARSE_INDEX_DIR)
+    keywords = KeywordIndex.build(docs)
+    keywords.save(config.KEYWORD_INDEX_PATH)
+    print(f"🔤 BM25 and keyword indexes saved ({len(keywords)} SQL keywords found)")
+    return sparse, keywords
+
+
+# ==================== PINECONE INDEX ====================
+def ensure_index(embeddings) -> None:
+    pc = Pinecone(api_key=config.PINECONE_API_KEY)
+    if pc.has_index(config.INDEX_NAME):
+        return
+    dimension = len(embeddings.embed_query("dimension probe"))
+    print(f"🆕 Creating Pinecone index '{config.INDEX_NAME}' ({dimension} dims)")
+    pc.create_index(
+        name=config.INDEX_NAME,
+        dimension=dimension,
+        metric="cosine",
+        spec=ServerlessSpec(cloud=config.PINECONE_CLOUD, region=config.PINECONE_REGION),
+    )
+
+
+# ==================== MAIN ====================
+def main():
+    parser = argparse.ArgumentParser(description="Build the vector index ahead of time so the API never embeds at startup.")
+    parser.add_argument("--registry", default=config.CORPUS_REGISTRY, help="JSON list of manuals and their dialects")
+    parser.add_argument("--pdf", help="ingest only this PDF as the whole corpus (ignores the registry)")
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS, help="page extraction processes (0 = one per core)")
+    parser.add_argument("--splitter", choices=["recursive", "structured"], default=config.SPLITTER, help="chunking strategy")
+    parser.add_argument("--backend", choices=["pinecone", "local", "fake"], default=config.VECTOR_BACKEND, help="vector store to build")
+    parser.add_argument("--force", action="store_true", help="re-upsert every chunk, e.g. after the index was wiped")
+    parser.add_argument("--parse-only", action="store_true", help="only fill the chunk store (used by hot reloads)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(config.INDEX_DIR, exist_ok=True)
+    registry_path = None if args.pdf else args.registry
+    registry = load_registry(registry_path, args.pdf or config.PDF_PATH)
+    print(f"📚 Corpus: {', '.join(entry['id'] for entry in registry)}")
+    docs = load_corpus(registry, args.workers, args.splitter)
+    if args.parse_only:
+        return
+
+    embeddings = make_embeddings()
+    if args.backend == "pinecone":
+        ensure_index(embeddings)
+    vectorstore = make_vectorstore(embeddings, backend=args.backend)
+    sync_index(
+        docs, vectorstore, manifest_path(args.backend), vector_index_name(args.backend),
+        embedding_model(), force=args.force,
+    )
+
+    build_lookup_indexes(registry, docs)
+    save_ingest_params(registry_path, args.pdf or config.PDF_PATH, args.splitter)
+    print(f"🏁 Ingestion finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
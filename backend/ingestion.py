@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import fcntl
+from contextlib import contextmanager
+
+MANIFEST_VERSION = 1
+UPSERT_BATCH_SIZE = 96  # Cohere embeds at most 96 texts per request
+
+
+# ==================== CHUNK HASHING ====================
+def chunk_hash(doc) -> str:
+    # chunk_id is assigned from the hash itself, so it never takes part in it. The source path is
+    # hashed by file name, so "SQL-Manual.pdf" and "/srv/app/SQL-Manual.pdf" give the same ids
+    metadata = {k: v for k, v in doc.metadata.items() if k != "chunk_id"}
+    if "source" in metadata:
+        metadata["source"] = os.path.basename(str(metadata["source"]))
+    payload = json.dumps(
+        {"text": doc.page_content, "metadata": metadata},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def vector_id(doc, digest: str) -> str:
+    source = os.path.splitext(os.path.basename(str(doc.metadata.get("source", "doc"))))[0]
+    return f"{source}-{digest[:32]}"
+
+
+# ==================== MANIFEST ====================
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def manifest_lock(path: str):
+    # Serialises ingestion across gunicorn workers / concurrent boots
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ==================== INCREMENTAL SYNC ====================
+def sync_index(docs, vectorstore, manifest_path: str, index_name: str, embedding_model: str, force: bool = False,
+               defer_deletes: bool = False) -> dict:
+    """Embed and upsert only new/changed chunks, delete vectors of removed ones.
+
+    With defer_deletes=True the removed vectors are only recorded in the manifest ("pending_deletes"),
+    so queries still running on the previous corpus can find them; `flush_deletes` removes them later.
+    """
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+
+    current = {}
+    for doc in docs:
+        digest = chunk_hash(doc)
+        doc.metadata["chunk_id"] = vector_id(doc, digest)
+        current.setdefault(digest, doc)
+
+    current_ids = {doc.metadata["chunk_id"] for doc in current.values()}
+    with manifest_lock(manifest_path):
+        manifest = load_manifest(manifest_path)
+        known = manifest.get("chunks", {})
+        # A chunk that came back since its deletion was deferred must keep its vector
+        pending = [vid for vid in manifest.get("pending_deletes", []) if vid not in current_ids]
+        if manifest and manifest.get("index_name") != index_name:
+            known, pending = {}, []  # different index: nothing of ours lives there yet
+        elif manifest and manifest.get("embedding_model") != embedding_model:
+            # Vectors from another model are not comparable: replace all of them
+            pending += [vid for vid in known.values() if vid not in current_ids]
+            known = {}
+
+        added = [digest for digest in current if force or digest not in known]
+        removed = [digest for digest in known if digest not in current]
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "index_name": index_name,
+            "embedding_model": embedding_model,
+            "chunks": {digest: vid for digest, vid in known.items() if digest in current},
+            "pending_deletes": pending,
+        }
+
+        # A local store writes its files once, in flush(), instead of after every batch
+        buffered = hasattr(vectorstore, "flush")
+        write_options = {"persist": False} if buffered else {}
+        for start in range(0, len(added), UPSERT_BATCH_SIZE):
+            batch = [current[digest] for digest in added[start:start + UPSERT_BATCH_SIZE]]
+            ids = [doc.metadata["chunk_id"] for doc in batch]
+            vectorstore.add_documents(batch, ids=ids, **write_options)
+            manifest["chunks"].update(zip(added[start:start + UPSERT_BATCH_SIZE], ids))
+            if not buffered:
+                save_manifest(manifest_path, manifest)  # a crash mid-way resumes from here
+
+        stale = pending + [known[digest] for digest in removed]
+        if defer_deletes:
+            manifest["pending_deletes"] = stale
+        elif stale:
+            vectorstore.delete(ids=stale, **write_options)
+            manifest["pending_deletes"] = []
+        if buffered:
+            vectorstore.flush()
+        save_manifest(manifest_path, manifest)
+
+    stats = {"added": len(added), "removed": len(removed), "unchanged": len(current) - len(added)}
+    print(f"🔁 Index sync: {stats['added']} added, {stats['removed']} removed, {stats['unchanged']} unchanged")
+    return stats
+
+
+def flush_deletes(vectorstore, manifest_path: str) -> int:
+    # Deletes the vectors a deferred sync left behind; returns how many
+    with manifest_lock(manifest_path):
+        manifest = load_manifest(manifest_path)
+        if not manifest.get("pending_deletes"):
+            return 0
+        live_ids = set(manifest.get("chunks", {}).values())
+        stale = [vid for vid in manifest["pending_deletes"] if vid not in live_ids]
+        if stale:
+            vectorstore.delete(ids=stale)
+        manifest["pending_deletes"] = []
+        save_manifest(manifest_path, manifest)
+    return len(stale)
@@ -0,0 +1,131 @@
+import re
+import json
+
+from corpus_registry import matches
+
+# Keywords / functions a user might ask "syntax of X" about; multi-word entries are matched as phrases
+SQL_KEYWORDS = [
+    "SELECT", "INSERT", "UPDATE", "DELETE", "MERGE", "TRUNCATE", "WITH",
+    "CREATE TABLE", "ALTER TABLE", "DROP TABLE", "CREATE INDEX", "DROP INDEX", "CREATE VIEW", "DROP VIEW",
+    "CREATE PROCEDURE", "CREATE FUNCTION", "CREATE TRIGGER", "CREATE SEQUENCE", "CREATE SCHEMA",
+    "WHERE", "GROUP BY", "ORDER BY", "HAVING", "DISTINCT", "LIMIT", "OFFSET", "FETCH",
+    "JOIN", "INNER JOIN", "LEFT JOIN", "LEFT OUTER JOIN", "RIGHT JOIN", "RIGHT OUTER JOIN",
+    "FULL JOIN", "FULL OUTER JOIN", "CROSS JOIN", "NATURAL JOIN", "SELF JOIN",
+    "UNION", "UNION ALL", "INTERSECT", "EXCEPT", "MINUS",
+    "LIKE", "BETWEEN", "IN", "EXISTS", "ANY", "ALL", "IS NULL", "IS NOT NULL", "CASE",
+    "COALESCE", "NULLIF", "CAST", "CONVERT", "NVL", "DECODE",
+    "COUNT", "SUM", "AVG", "MIN", "MAX",
+    "ROW_NUMBER", "RANK", "DENSE_RANK", "NTILE", "LAG", "LEAD", "OVER", "PARTITION BY",
+    "SUBSTRING", "SUBSTR", "TRIM", "UPPER", "LOWER", "LENGTH", "REPLACE", "CONCAT", "ROUND",
+    "PRIMARY KEY", "FOREIGN KEY", "UNIQUE", "CHECK", "DEFAULT", "NOT NULL", "CONSTRAINT",
+    "GRANT", "REVOKE", "COMMIT", "ROLLBACK", "SAVEPOINT",
+]
+
+# "syntax of X", "what is X", "explain the X clause", ... -> X
+QUERY_PATTERNS = [
+    re.compile(r"^(?:what is the |show (?:me )?the |give (?:me )?the )?syntax (?:of|for) (?:the )?(?P<kw>.+)$"),
+    re.compile(r"^(?P<kw>.+?) syntax$"),
+    re.compile(r"^(?:what is|what's|what are|what does|define|explain|how to use|how do i use|usage of) (?:an? |the )?(?P<kw>.+?)(?: do| mean| work)?$"),
+    re.compile(r"^(?P<kw>.+)$"),
+]
+FILLER_WORDS = {"sql", "clause", "function", "statement", "keyword", "command", "operator", "in"}
+
+
+def normalize_keyword(text: str) -> str:
+    words = re.sub(r"[^a-z0-9_ ]", " ", text.lower()).split()
+    # "IN" is also a keyword, so only strip trailing filler ("left join in sql" -> "left join")
+    while len(words) > 1 and words[-1] in FILLER_WORDS:
+        words.pop()
+    return " ".join(words).upper()
+
+
+# ==================== KEYWORD INDEX ====================
+class KeywordIndex:
+    """Normalized SQL keyword -> {document id: rows of the chunks that define it (headings / syntax lines first)}.
+
+    Kept per manual, so a filtered lookup still finds its own manual's definition and an unfiltered one
+    answers from a single dialect (the first registered manual that defines the keyword).
+    """
+
+    def __init__(self, entries: dict, docs):
+        self.entries = entries
+        self.docs = docs
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, docs, max_chunks: int = 3):
+        patterns = {
+            keyword: re.compile(r"^" + r"\s+".join(map(re.escape, keyword.split())) + r"\b(?P<rest>.*)$", re.IGNORECASE)
+            for keyword in SQL_KEYWORDS
+        }
+        scored = {}
+        for row, doc in enumerate(docs):
+            for line in doc.page_content.splitlines():
+                line = line.strip()
+                if not line or len(line) > 80:
+                    continue
+                for keyword, pattern in patterns.items():
+                    match = pattern.match(line)
+                    if not match:
+                        continue
+                    rest = match.group("rest").strip()
+                    # A bare heading ("GROUP BY", "COALESCE Function") beats a syntax line ("COALESCE(expr, ...)")
+                    if not rest or rest.lower().rstrip(":") in ("clause", "function", "statement", "keyword", "operator"):
+                        score = 2
+                    elif rest.startswith("("):
+                        score = 1
+                    else:
+                        continue
+                    best = scored.setdefault(keyword, {}).setdefault(doc.metadata.get("document", ""), {})
+                    best[row] = max(best.get(row, 0), score)
+
+        entries = {}
+        for keyword, documents in scored.items():
+            entries[keyword] = {
+                document: sorted(rows, key=lambda row: (-rows[row], row))[:max_chunks]
+                for document, rows in documents.items()
+            }
+        return cls(entries, docs)
+
+    def _rows(self, keyword: str, filter=None):
+        # Rows of one manual: the first in corpus order with chunks that pass the filter
+        for rows in sorted(self.entries[keyword].values(), key=min):
+            rows = [row for row in rows if not filter or matches(self.docs[row].metadata, filter)]
+            if rows:
+                return rows
+        return []
+
+    def lookup(self, query: str, filter=None, k: int = None):
+        text = " ".join(query.lower().strip().rstrip("?!. ").split())
+        for pattern in QUERY_PATTERNS:
+            match = pattern.match(text)
+            if match:
+                keyword = normalize_keyword(match.group("kw"))
+                rows = self._rows(keyword, filter) if keyword in self.entries else []
+                if rows:
+                    return keyword, [self.docs[row] for row in rows[:k]]
+        return None, []
+
+    # ---------- persistence ----------
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"doc_count": len(self.docs), "keywords": self.entries}, f, indent=1, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str, docs):
+        # docs: the corpus chunks the index was built from, in the same order
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return None
+        if saved.get("doc_count") != len(docs):
+            print(f"⚠️ Keyword index at {path} does not match the corpus, ignoring it")
+            return None
+        if any(isinstance(rows, list) for rows in saved["keywords"].values()):
+            # Saved before entries were kept per manual; re-run ingest.py to save the new layout
+            print(f"⚠️ Keyword index at {path} predates per-document entries, rebuilding it in memory")
+            return cls.build(docs)
+        return cls(saved["keywords"], docs)
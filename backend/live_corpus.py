@@ -0,0 +1,56 @@
+import threading
+from contextlib import contextmanager
+
+from corpus_registry import filter_key
+
+
+# ==================== LIVE CORPUS ====================
+class LiveCorpus:
+    """Everything that must change together when the corpus is reloaded: the registry, the retriever
+    (vector store + BM25 + keyword index) and the answer caches built on top of them.
+
+    A query takes the current LiveCorpus once (`with rag.live.use() as corpus`) and keeps it until it
+    finishes, so a reload only has to swap one reference; `wait_idle` tells the reloader when the
+    previous corpus has no queries left and its vectors can be deleted.
+    """
+
+    def __init__(self, registry, retriever, make_answer_cache, generation: int = 0):
+        self.registry = registry
+        self.retriever = retriever
+        self.generation = generation
+        self._make_answer_cache = make_answer_cache
+        # A filtered question has a different answer, so each partition gets its own cache.
+        # Filters are validated against the registry, which keeps this dict small.
+        self.answer_caches = {"": make_answer_cache()}
+        self.active = 0
+        self._idle = threading.Condition()
+
+    def answer_cache(self, filter=None):
+        key = filter_key(filter)
+        if key not in self.answer_caches:
+            self.answer_caches.setdefault(key, self._make_answer_cache())
+        return self.answer_caches[key]
+
+    @contextmanager
+    def use(self):
+        with self._idle:
+            self.active += 1
+        try:
+            yield self
+        finally:
+            with self._idle:
+                self.active -= 1
+                if not self.active:
+                    self._idle.notify_all()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        with self._idle:
+            return self._idle.wait_for(lambda: not self.active, timeout)
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "documents": [entry["id"] for entry in self.registry],
+            "chunks": len(self.retriever.sparse.docs) if self.retriever.sparse is not None else None,
+            "active_queries": self.active,
+        }
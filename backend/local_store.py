@@ -0,0 +1,317 @@
+import os
+import json
+import threading
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from quantization import QUANTIZERS, RESCORE_FACTORS, top_rows
+from ann_index import IVFIndex, MIN_POINTS_PER_LIST, default_nlist
+from corpus_registry import matches, filter_key
+
+
+# ==================== LOCAL VECTOR STORE ====================
+class LocalVectorStore(VectorStore):
+    """In-process cosine search over a normalized float32 matrix, persisted as a memory-mapped .npy file.
+
+    With quantization="int8" or "binary" only the compact codes are scanned; the best
+    k * rescore_factor rows are then rescored exactly from the (memory-mapped) float vectors.
+    With index="ivf" a query only looks at the rows of its `nprobe` nearest IVF lists.
+    A metadata `filter` (Pinecone syntax) restricts the scan to that partition's rows.
+    Writes with persist=False (bulk ingest) only append in memory; `flush()` indexes and saves them once.
+    """
+
+    def __init__(self, embedding, path: str = None, quantization: str = "none", rescore_factor: int = 0,
+                 index: str = "flat", nlist: int = 0, nprobe: int = 8):
+        if quantization != "none" and quantization not in QUANTIZERS:
+            raise ValueError(f"Unknown quantization: {quantization}")
+        if index not in ("flat", "ivf"):
+            raise ValueError(f"Unknown local index type: {index}")
+        self._embedding = embedding
+        self.path = path
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor or RESCORE_FACTORS.get(quantization, 1)
+        self.index = index
+        self.nlist = nlist  # 0 = 4 * sqrt(n), chosen at each (re)training
+        self.nprobe = nprobe
+        self._ids = []
+        self._texts = []
+        self._metadatas = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._buffer = None  # spare capacity behind _vectors, so appends don't copy the whole matrix
+        self._codes = None
+        self._ivf = None  # trained once the corpus is big enough to benefit
+        self._partitions = {}  # filter key -> matching rows, rebuilt after writes
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+        self._indexed = len(self._ids)  # rows already filed in the codes / IVF lists
+        rebuilt = quantization != "none" and self._codes is None
+        if rebuilt:
+            self._codes = QUANTIZERS[quantization].build(self._vectors)
+        rebuilt = self._maybe_train() or rebuilt
+        if rebuilt and path and self._ids:
+            try:
+                self._save_derived()  # the next boot attaches to them instead of rebuilding
+            except OSError as e:
+                print(f"⚠️ Could not save the rebuilt local index files: {e}")
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def search_bytes(self) -> int:
+        # Bytes scanned by every query: the codes when quantized, otherwise the float matrix
+        return self._codes.nbytes if self._codes is not None else self._vectors.nbytes
+
+    # ---------- persistence ----------
+    def _files(self):
+        return os.path.join(self.path, "vectors.npy"), os.path.join(self.path, "docs.json")
+
+    def _codes_prefix(self) -> str:
+        return os.path.join(self.path, f"codes-{self.quantization}")
+
+    def _ivf_prefix(self) -> str:
+        return os.path.join(self.path, "ivf")
+
+    def _load(self) -> None:
+        vectors_path, docs_path = self._files()
+        if not (os.path.exists(vectors_path) and os.path.exists(docs_path)):
+            return
+        with open(docs_path, "r", encoding="utf-8") as f:
+            docs = json.load(f)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if vectors.shape[0] != len(docs["ids"]):
+            print(f"⚠️ Local index at {self.path} is inconsistent, ignoring it")
+            return
+        self._ids, self._texts, self._metadatas = docs["ids"], docs["texts"], docs["metadatas"]
+        self._vectors = vectors
+        if self.quantization != "none" and os.path.exists(f"{self._codes_prefix()}.npz"):
+            codes = QUANTIZERS[self.quantization].load(self._codes_prefix())
+            if len(codes) == len(self._ids):
+                self._codes = codes
+        if self.index == "ivf":
+            ivf = IVFIndex.load(self._ivf_prefix())
+            if ivf is not None and len(ivf) == len(self._ids):
+                self._ivf = ivf
+
+    def persist(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        vectors_path, docs_path = self._files()
+        with open(f"{vectors_path}.tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self._vectors))
+        with open(f"{docs_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"ids": self._ids, "texts": self._texts, "metadatas": self._metadatas}, f, ensure_ascii=False)
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        os.replace(f"{docs_path}.tmp", docs_path)
+        self._save_derived()
+        if self._codes is not None:
+            # Quantized stores only keep the codes resident; the floats are paged in for rescoring
+            self._vectors = np.load(vectors_path, mmap_mode="r")
+            self._buffer = None
+
+    def _save_derived(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        if self._ivf is not None:
+            self._ivf.save(self._ivf_prefix())
+        if self._codes is not None:
+            self._codes.save(self._codes_prefix())
+
+    def flush(self) -> None:
+        # Indexes and saves everything written with persist=False
+        with self._lock:
+            self._index_new_rows()
+            self.persist()
+
+    # ---------- writes ----------
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def add_texts(self, texts, metadatas=None, ids=None, persist: bool = True, **kwargs):
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        ids = list(ids) if ids is not None else [f"local-{len(self._ids) + i}" for i in range(len(texts))]
+        if not texts:
+            return []
+        vectors = self._normalize(self._embedding.embed_documents(texts))
+
+        with self._lock:
+            replaced = set(ids)  # upsert: rows with the same id are replaced
+            if not replaced.isdisjoint(self._ids):
+                self._keep_rows([row for row, vid in enumerate(self._ids) if vid not in replaced], vectors.shape[1])
+            self._append_vectors(vectors)
+            self._ids += ids
+            self._texts += texts
+            self._metadatas += metadatas
+            self._partitions = {}
+            if persist:
+                self._index_new_rows()
+                self.persist()
+        return ids
+
+    def delete(self, ids=None, persist: bool = True, **kwargs):
+        if not ids:
+            return False
+        drop = set(ids)
+        with self._lock:
+            self._keep_rows([row for row, vid in enumerate(self._ids) if vid not in drop], self._vectors.shape[1])
+            if persist:
+                self._index_new_rows()
+                self.persist()
+        return True
+
+    def _append_vectors(self, vectors) -> None:
+        # Amortized O(1) per row: the buffer doubles when full instead of re-concatenating every batch
+        size = self._vectors.shape[0]
+        needed = size + vectors.shape[0]
+        if self._buffer is None or self._buffer.shape[0] < needed or self._buffer.shape[1] != vectors.shape[1]:
+            buffer = np.empty((max(needed, 2 * size), vectors.shape[1]), dtype=np.float32)
+            if size:
+                buffer[:size] = self._vectors
+            self._buffer = buffer
+        self._buffer[size:needed] = vectors
+        self._vectors = self._buffer[:needed]
+
+    def _index_new_rows(self) -> None:
+        # Files rows appended since the last call into the codes / IVF lists, as one batch
+        new = self._vectors[self._indexed:]
+        if len(new):
+            if self._codes is not None:
+                codes = QUANTIZERS[self.quantization].build(new)
+                # An empty store's codes have no dimension yet
+                self._codes = self._codes.extend(codes) if self._indexed else codes
+            if self._ivf is not None:
+                self._ivf.add(new)  # incremental: filed under the existing centroids
+        self._indexed = len(self._ids)
+        self._maybe_train()
+
+    def _keep_rows(self, rows, dim: int) -> None:
+        self._index_new_rows()
+        self._partitions = {}
+        self._ids = [self._ids[row] for row in rows]
+        self._texts = [self._texts[row] for row in rows]
+        self._metadatas = [self._metadatas[row] for row in rows]
+        self._vectors = np.asarray(self._vectors[rows], dtype=np.float32).reshape(len(rows), dim)
+        self._buffer = None
+        self._indexed = len(rows)
+        if self._codes is not None:
+            # An empty store has no dimension yet, so its codes are rebuilt with the right shape
+            self._codes = self._codes.take(rows) if rows else QUANTIZERS[self.quantization].build(self._vectors)
+        if self._ivf is not None:
+            self._ivf = self._ivf.take(rows) if rows else None
+
+    def _maybe_train(self) -> bool:
+        if self.index != "ivf" or (self._ivf is not None and not self._ivf.needs_retrain()):
+            return False
+        nlist = self.nlist or default_nlist(len(self._ids))
+        if len(self._ids) < nlist * MIN_POINTS_PER_LIST:
+            return False
+        self._ivf = IVFIndex.train(self._vectors, nlist)
+        return True
+
+    def _ensure_indexed(self) -> None:
+        # A search between persist=False writes and flush() sees every row
+        if self._indexed < len(self._ids):
+            with self._lock:
+                self._index_new_rows()
+
+    # ---------- search ----------
+    def _partition_rows(self, filter):
+        key = filter_key(filter)
+        rows = self._partitions.get(key)
+        if rows is None:
+            rows = np.array([row for row, metadata in enumerate(self._metadatas) if matches(metadata, filter)],
+                            dtype=np.int64)
+            self._partitions[key] = rows
+        return rows
+
+    def _search(self, queries: np.ndarray, k: int, rows=None):
+        # queries: (m, d) normalized -> [(rows, scores)] per query, best first.
+        # rows: the partition selected by a filter (None = the whole corpus)
+        if self._ivf is not None:
+            results = []
+            for query in queries:
+                candidates = self._ivf.probe(query, self.nprobe)
+                if rows is not None:
+                    candidates = np.intersect1d(candidates, rows, assume_unique=True)
+                    if len(candidates) < k:  # the probed lists barely touch a small partition
+                        candidates = rows
+                results.append(self._rank(candidates, query, k))
+            return results
+        if rows is not None:
+            if self._codes is not None:
+                return [self._rank(rows, query, k) for query in queries]
+            scores = np.asarray(self._vectors[rows], dtype=np.float32) @ queries.T  # only the partition
+        else:
+            if self._codes is not None:
+                approx = self._codes.scores(queries)
+                everything = np.arange(len(self._ids))
+                return [self._rescore(everything, approx[:, column], query, k) for column, query in enumerate(queries)]
+            scores = self._vectors @ queries.T  # one matmul over the whole corpus
+        results = []
+        for column in range(scores.shape[1]):
+            best = top_rows(scores[:, column], k)
+            results.append((best if rows is None else rows[best], scores[best, column]))
+        return results
+
+    def _rank(self, candidates, query, k: int):
+        if self._codes is not None:
+            return self._rescore(candidates, self._codes.scores_rows(candidates, query), query, k)
+        scores = np.asarray(self._vectors[candidates], dtype=np.float32) @ query
+        best = top_rows(scores, k)
+        return candidates[best], scores[best]
+
+    def _rescore(self, candidates, approx, query, k: int):
+        # Sorted shortlist rows read the memory-mapped floats in file order
+        shortlist = np.sort(candidates[top_rows(approx, k * self.rescore_factor)])
+        exact = np.asarray(self._vectors[shortlist], dtype=np.float32) @ query
+        best = top_rows(exact, k)
+        return shortlist[best], exact[best]
+
+    def _document(self, row: int) -> Document:
+        return Document(id=self._ids[row], page_content=self._texts[row], metadata=dict(self._metadatas[row]))
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 4, filter: dict = None, **kwargs):
+        self._ensure_indexed()
+        rows = self._partition_rows(filter) if filter else None
+        if not self._ids or k <= 0 or (rows is not None and not len(rows)):
+            return []
+        found, scores = self._search(self._normalize(embedding)[None, :], k, rows)[0]
+        return [(self._document(row), float(score)) for row, score in zip(found, scores)]
+
+    def similarity_search_by_vectors(self, embeddings, k: int = 4, filter: dict = None, **kwargs):
+        # Batch retrieval: one (n x d) @ (d x m) matmul (or one pass over the codes) for all m queries
+        self._ensure_indexed()
+        rows = self._partition_rows(filter) if filter else None
+        if not self._ids or k <= 0 or not len(embeddings) or (rows is not None and not len(rows)):
+            return [[] for _ in embeddings]
+        return [[self._document(row) for row in found] for found, _ in self._search(self._normalize(embeddings), k, rows)]
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs):
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1) / 2  # cosine -> [0, 1]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, path: str = None, quantization: str = "none",
+                   index: str = "flat", **kwargs):
+        store = cls(embedding, path=path, quantization=quantization, index=index)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
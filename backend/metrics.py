@@ -0,0 +1,138 @@
+import time
+import threading
+from bisect import bisect_left
+
+# Prometheus text exposition (format 0.0.4) without a client library: a few locked counters per
+# observation, so it stays on in production. Metrics are per process, like the caches they describe.
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_metrics = []
+_collectors = []
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ==================== METRIC TYPES ====================
+class Counter:
+    def __init__(self, name: str, help: str, labels=(), register: bool = True):
+        # register=False: only read by a collector that merges it with other sources
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values = {} if labels else {(): 0}  # an unlabelled counter is exported from zero
+        self._lock = threading.Lock()
+        if register:
+            _metrics.append(self)
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Fixed-bucket histogram; `observe` is one bisect plus two additions under a lock."""
+
+    def __init__(self, name: str, help: str, labels=(), buckets=STAGE_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        names = self.label_names + ("le",)
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class _Timer:
+    # `with STAGE_SECONDS.time("embed"):` - a plain class, cheaper than a generator context manager
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram, self.labels = histogram, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+def register_collector(collect) -> None:
+    # collect() -> [(name, type, help, [(label dict, value), ...])], read at scrape time only
+    _collectors.append(collect)
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        for name, kind, help, samples in collect():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}" for labels, value in samples]
+    return "\n".join(lines) + "\n"
+
+
+# ==================== RAG METRICS ====================
+STAGE_SECONDS = Histogram(
+    "rag_stage_seconds",
+    "Latency of each query pipeline stage (llm_ttft only on streaming answers).",
+    labels=("stage",),
+)
+LLM_TOKENS = Counter(
+    "rag_llm_tokens_total",
+    "LLM tokens, from the provider's usage metadata when present, otherwise estimated.",
+    labels=("kind",),
+)
+# Exported by rag.cache_metrics together with the embedding / rerank caches' own counts
+ANSWER_CACHE_LOOKUPS = Counter("rag_answer_cache_lookups_total", "", labels=("result",), register=False)
+QUERY_ERRORS = Counter("rag_query_errors_total", "Queries answered with an error message instead of an answer.")
+ADMISSION_WAIT = Histogram(
+    "rag_admission_wait_seconds", "Time queries spent queued for a concurrency slot (admitted or timed out).",
+    labels=("mode",),
+)
+ADMISSION_RESULTS = Counter(
+    "rag_admission_total", "Admission decisions: admitted, queue_full (429) or queue_timeout (503).",
+    labels=("mode", "result"),
+)
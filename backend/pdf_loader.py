@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from sql_splitter import SQLManualSplitter, extract_lines
+
+BATCHES_PER_WORKER = 4  # smaller page ranges keep workers busy when some pages are slow
+
+
+# ==================== METADATA (mirrors PyPDFLoader) ====================
+def document_metadata(reader: PdfReader, source: str) -> dict:
+    raw = {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+    raw.update(reader.metadata or {})
+    raw.update({"source": source, "total_pages": len(reader.pages)})
+
+    metadata = {}
+    for key, value in raw.items():
+        if type(value) not in (str, int):
+            value = str(value)
+        key = key.lstrip("/").lower()
+        if key in ("creationdate", "moddate"):
+            try:
+                value = datetime.strptime(value.replace("'", ""), "D:%Y%m%d%H%M%S%z").isoformat("T")
+            except ValueError:
+                pass
+        elif isinstance(value, str):
+            value = value.strip()
+        metadata[key] = value
+    return metadata
+
+
+# ==================== WORKERS ====================
+def page_metadata(reader: PdfReader, base_metadata: dict, i: int) -> dict:
+    return {**base_metadata, "page": i, "page_label": reader.page_labels[i]}
+
+
+def _load_page_range(pdf_path: str, start: int, end: int, chunk_size: int, chunk_overlap: int):
+    reader = PdfReader(pdf_path)
+    base_metadata = document_metadata(reader, pdf_path)
+    pages = [
+        Document(
+            page_content=reader.pages[i].extract_text(extraction_mode="plain").strip(),
+            metadata=page_metadata(reader, base_metadata, i),
+        )
+        for i in range(start, end)
+    ]
+    # The splitter works per document, so splitting page batches gives the same chunks as splitting everything
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.split_documents(pages)
+
+
+def _load_layout_range(pdf_path: str, start: int, end: int):
+    # Structured splitting needs whole sections, which span pages, so workers only extract layout
+    reader = PdfReader(pdf_path)
+    base_metadata = document_metadata(reader, pdf_path)
+    return [(page_metadata(reader, base_metadata, i), extract_lines(reader.pages[i])) for i in range(start, end)]
+
+
+# ==================== PARALLEL LOAD + SPLIT ====================
+def load_and_split_parallel(pdf_path: str, chunk_size: int, chunk_overlap: int, workers: int = 0,
+                            splitter: str = "recursive"):
+    # splitter="structured": chunk_size is the max section-piece size and chunk_overlap is unused
+    total_pages = len(PdfReader(pdf_path).pages)
+    workers = max(1, min(workers or os.cpu_count() or 1, total_pages))
+    if splitter == "structured":
+        task, args = _load_layout_range, ()
+    else:
+        task, args = _load_page_range, (chunk_size, chunk_overlap)
+
+    start_time = time.perf_counter()
+    if workers == 1:
+        results = task(pdf_path, 0, total_pages, *args)
+    else:
+        batch = max(1, -(-total_pages // (workers * BATCHES_PER_WORKER)))
+        ranges = [(start, min(start + batch, total_pages)) for start in range(0, total_pages, batch)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(task, pdf_path, start, end, *args) for start, end in ranges]
+            # Collect in submission order so results come back in page order
+            results = [item for future in futures for item in future.result()]
+    docs = SQLManualSplitter(max_chars=chunk_size).split_pages(results) if splitter == "structured" else results
+    elapsed = time.perf_counter() - start_time
+
+    print(f"📄 Parsed {total_pages} pages in {elapsed:.2f}s "
+          f"({total_pages / max(elapsed, 1e-9):.1f} pages/sec, {workers} workers)")
+    return docs
+
+
+# ==================== SCALING CHECK ====================
+if __name__ == "__main__":
+    # python pdf_loader.py SQL-Manual.pdf 1 2 4 8
+    path = sys.argv[1] if len(sys.argv) > 1 else "SQL-Manual.pdf"
+    for count in [int(arg) for arg in sys.argv[2:]] or [1, os.cpu_count() or 1]:
+        load_and_split_parallel(path, 1000, 200, workers=count)
@@ -0,0 +1,22 @@
+import config
+from context_builder import build_context
+
+# ==================== PROMPT ====================
+PROMPT_TEMPLATE = """
+You are a helpful SQL tutor. Use the given context and your SQL knowledge.
+Explain the answer clearly and give short examples if useful.
+
+Context:
+{context}
+
+Question:
+{query}
+
+Answer:
+"""
+
+
+def build_prompt(results, query: str, token_budget: int = config.CONTEXT_TOKEN_BUDGET) -> str:
+    # Overlapping / same-page chunks are merged and the context is capped at the token budget
+    context = build_context(results, token_budget, max_overlap=2 * config.CHUNK_OVERLAP)
+    return PROMPT_TEMPLATE.format(context=context, query=query)
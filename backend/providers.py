@@ -0,0 +1,107 @@
+import os
+
+from langchain_cohere import CohereEmbeddings
+from langchain_pinecone import PineconeVectorStore
+from langchain_groq import ChatGroq
+
+import config
+from embedding_cache import CachedEmbeddings
+from local_store import LocalVectorStore
+from reranker import CrossEncoderReranker, resolve_model_files
+from fakes import Latency, HashedEmbeddings, FakeVectorStore, FakeChatModel
+
+
+# ==================== EMBEDDINGS ====================
+def embedding_model() -> str:
+    # Keys the embedding cache and the ingestion manifest, so fake and real vectors never mix
+    if config.EMBEDDING_PROVIDER == "fake":
+        return f"fake-hashed-{config.FAKE_EMBEDDING_DIM}"
+    return config.EMBEDDING_MODEL
+
+
+def make_embeddings():
+    # Repeated questions and re-ingested chunks are served from the cache, not Cohere
+    if config.EMBEDDING_PROVIDER == "fake":
+        latency = Latency(config.FAKE_EMBED_LATENCY_MS, config.FAKE_EMBED_JITTER_MS, seed=config.FAKE_SEED)
+        inner = HashedEmbeddings(dim=config.FAKE_EMBEDDING_DIM, latency=latency)
+    elif config.EMBEDDING_PROVIDER == "cohere":
+        inner = CohereEmbeddings(model=config.EMBEDDING_MODEL, cohere_api_key=config.COHERE_API_KEY)
+    else:
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER: {config.EMBEDDING_PROVIDER}")
+    return CachedEmbeddings(
+        inner,
+        model=embedding_model(),
+        db_path=config.EMBEDDING_CACHE_PATH or None,
+        memory_bytes=config.EMBEDDING_CACHE_MB << 20,
+    )
+
+
+# ==================== VECTOR STORE ====================
+def make_vectorstore(embeddings, backend: str = None):
+    # Attaches to an index built by ingest.py; nothing is embedded here
+    backend = backend or config.VECTOR_BACKEND
+    if backend == "local":
+        return LocalVectorStore(
+            embeddings,
+            path=config.LOCAL_INDEX_DIR,
+            quantization=config.LOCAL_QUANTIZATION,
+            rescore_factor=config.LOCAL_RESCORE_FACTOR,
+            index=config.LOCAL_INDEX_TYPE,
+            nlist=config.LOCAL_IVF_NLIST,
+            nprobe=config.LOCAL_IVF_NPROBE,
+        )
+    if backend == "fake":
+        latency = Latency(config.FAKE_SEARCH_LATENCY_MS, config.FAKE_SEARCH_JITTER_MS, seed=config.FAKE_SEED + 1)
+        return FakeVectorStore(embeddings, path=config.FAKE_INDEX_DIR, latency=latency)
+    if backend != "pinecone":
+        raise ValueError(f"Unknown VECTOR_BACKEND: {backend}")
+    return PineconeVectorStore(
+        index_name=config.INDEX_NAME,
+        embedding=embeddings,
+        pinecone_api_key=config.PINECONE_API_KEY,
+        host=config.PINECONE_HOST,
+    )
+
+
+def vector_index_name(backend: str = None) -> str:
+    # Recorded in the ingestion manifest, so a manifest is never applied to the wrong store
+    backend = backend or config.VECTOR_BACKEND
+    if backend == "fake":
+        return f"fake:{config.FAKE_INDEX_DIR}"
+    return config.INDEX_NAME if backend == "pinecone" else f"local:{config.LOCAL_INDEX_DIR}"
+
+
+def manifest_path(backend: str = None) -> str:
+    backend = backend or config.VECTOR_BACKEND
+    if backend == "fake":
+        return os.path.join(config.FAKE_INDEX_DIR, "manifest.json")
+    return config.MANIFEST_PATH if backend == "pinecone" else config.LOCAL_MANIFEST_PATH
+
+
+# ==================== RERANKER ====================
+def make_reranker():
+    if not config.RERANK:
+        return None
+    model_path, tokenizer_path = resolve_model_files(config.RERANK_MODEL, config.RERANK_MODEL_FILE)
+    return CrossEncoderReranker(
+        model_path,
+        tokenizer_path,
+        budget_ms=config.RERANK_BUDGET_MS,
+        max_length=config.RERANK_MAX_LENGTH,
+        cache_size=config.RERANK_CACHE_SIZE,
+        threads=config.RERANK_THREADS,
+    )
+
+
+# ==================== LLM ====================
+def make_llm():
+    if config.LLM_PROVIDER == "fake":
+        return FakeChatModel(
+            mode=config.FAKE_LLM_MODE,
+            template=config.FAKE_LLM_TEMPLATE,
+            ttft=Latency(config.FAKE_LLM_TTFT_MS, config.FAKE_LLM_JITTER_MS, seed=config.FAKE_SEED + 2),
+            per_token=Latency(config.FAKE_LLM_TOKEN_MS, config.FAKE_LLM_JITTER_MS, seed=config.FAKE_SEED + 3),
+        )
+    if config.LLM_PROVIDER != "groq":
+        raise ValueError(f"Unknown LLM_PROVIDER: {config.LLM_PROVIDER}")
+    return ChatGroq(groq_api_key=config.GROQ_API_KEY, model_name=config.LLM_MODEL)
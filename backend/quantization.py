@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+
+BLOCK_ROWS = 2048  # rows decoded per step: stays in cache and never materializes a float copy of the corpus
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def top_rows(scores, k: int):
+    # Indices of the k largest scores, best first
+    if k >= scores.shape[0]:
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def popcount(bits):
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        if bits.shape[-1] % 8 == 0:
+            bits = bits.view(np.uint64)  # 8x fewer elements to count and sum
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int32)
+    return POPCOUNT_TABLE[bits].sum(axis=-1, dtype=np.int32)
+
+
+# ==================== INT8 SCALAR QUANTIZATION ====================
+class Int8Codes:
+    """One int8 per dimension plus a float32 scale per vector: 4x smaller than float32.
+
+    Queries stay float (asymmetric scoring), so the only loss is the rounding on the corpus side.
+    """
+
+    name = "int8"
+
+    def __init__(self, codes, scales):
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    @classmethod
+    def build(cls, vectors):
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        scales = np.empty(vectors.shape[0], dtype=np.float32)
+        for start in range(0, vectors.shape[0], BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float32)
+            peak = np.abs(block).max(axis=1, initial=0.0)
+            scale = np.where(peak == 0, 1.0, peak / 127).astype(np.float32)
+            codes[start:start + len(block)] = np.round(block / scale[:, None])
+            scales[start:start + len(block)] = scale
+        return cls(codes, scales)
+
+    def scores(self, queries):
+        # (n, m) approximate cosine for normalized (m, d) queries
+        scores = np.empty((len(self), queries.shape[0]), dtype=np.float32)
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = self.codes[start:start + BLOCK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = (block @ queries.T) * self.scales[start:start + len(block), None]
+        return scores
+
+    def scores_rows(self, rows, query):
+        # Approximate cosine of one query against a subset of rows (e.g. an IVF probe)
+        return (self.codes[rows].astype(np.float32) @ query) * self.scales[rows]
+
+    def take(self, rows):
+        return type(self)(self.codes[rows], self.scales[rows])
+
+    def extend(self, other):
+        return type(self)(np.concatenate([self.codes, other.codes]), np.concatenate([self.scales, other.scales]))
+
+    def save(self, prefix: str) -> None:
+        np.savez(f"{prefix}.{os.getpid()}.tmp.npz", codes=self.codes, scales=self.scales)
+        os.replace(f"{prefix}.{os.getpid()}.tmp.npz", f"{prefix}.npz")
+
+    @classmethod
+    def load(cls, prefix: str):
+        arrays = np.load(f"{prefix}.npz")
+        return cls(arrays["codes"], arrays["scales"])
+
+
+# ==================== BINARY QUANTIZATION ====================
+class BinaryCodes:
+    """Sign bits only: 1024 dims -> 128 bytes, 32x smaller than float32. Scored by Hamming distance."""
+
+    name = "binary"
+
+    def __init__(self, bits, dim: int):
+        self.bits = bits
+        self.dim = dim
+
+    def __len__(self):
+        return self.bits.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    @classmethod
+    def build(cls, vectors):
+        bits = np.empty((vectors.shape[0], -(-vectors.shape[1] // 8)), dtype=np.uint8)
+        for start in range(0, vectors.shape[0], BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + BLOCK_ROWS])
+            bits[start:start + len(block)] = np.packbits(block > 0, axis=1)
+        return cls(bits, vectors.shape[1])
+
+    def scores(self, queries):
+        # dim - 2 * hamming: the cosine of the sign vectors, scaled by dim
+        query_bits = np.packbits(queries > 0, axis=1)
+        scores = np.empty((len(self), queries.shape[0]), dtype=np.float32)
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = self.bits[start:start + BLOCK_ROWS]
+            for column, bits in enumerate(query_bits):
+                scores[start:start + len(block), column] = self.dim - 2 * popcount(block ^ bits)
+        return scores
+
+    def scores_rows(self, rows, query):
+        return (self.dim - 2 * popcount(self.bits[rows] ^ np.packbits(query > 0))).astype(np.float32)
+
+    def take(self, rows):
+        return type(self)(self.bits[rows], self.dim)
+
+    def extend(self, other):
+        return type(self)(np.concatenate([self.bits, other.bits]), self.dim)
+
+    def save(self, prefix: str) -> None:
+        np.savez(f"{prefix}.{os.getpid()}.tmp.npz", bits=self.bits, dim=np.int64(self.dim))
+        os.replace(f"{prefix}.{os.getpid()}.tmp.npz", f"{prefix}.npz")
+
+    @classmethod
+    def load(cls, prefix: str):
+        arrays = np.load(f"{prefix}.npz")
+        return cls(arrays["bits"], int(arrays["dim"]))
+
+
+QUANTIZERS = {"int8": Int8Codes, "binary": BinaryCodes}
+RESCORE_FACTORS = {"int8": 4, "binary": 10}  # shortlist = k * factor, rescored with the float vectors
@@ -0,0 +1,408 @@
+import os
+import json
+import time
+
+import config
+from providers import make_embeddings, make_vectorstore, make_reranker, make_llm, manifest_path
+from answer_cache import SemanticAnswerCache
+from singleflight import SingleFlight, AsyncSingleFlight, normalize_query
+from retrieval import Retriever
+from sparse_index import BM25Index
+from keyword_index import KeywordIndex
+from chunk_store import load_chunks
+from prompts import build_prompt
+from context_builder import estimate_tokens
+from metrics import STAGE_SECONDS, LLM_TOKENS, ANSWER_CACHE_LOOKUPS, QUERY_ERRORS, register_collector
+from corpus_registry import load_registry, filter_key
+from live_corpus import LiveCorpus
+from admission import Admission, AsyncAdmission
+
+# ==================== VECTOR STORE SETUP ====================
+# The index is built offline by `python ingest.py`; the server only attaches to it
+if not os.path.exists(manifest_path()):
+    print(f"⚠️ No ingestion manifest at {manifest_path()} - run `python ingest.py` if the index is empty")
+embeddings = make_embeddings()
+vectorstore = make_vectorstore(embeddings)
+print(f"✅ Vector store connected successfully ({config.VECTOR_BACKEND})")
+
+# ==================== RETRIEVER ====================
+reranker = make_reranker()  # shared across corpus reloads: its cache is keyed by content-hashed chunk ids
+
+def make_retriever(store, sparse=None, keywords=None):
+    return Retriever(
+        store,
+        sparse=sparse,
+        keywords=keywords if config.KEYWORD_LOOKUP else None,
+        mode=config.RETRIEVAL_MODE,
+        k=config.TOP_K,
+        candidates=config.HYBRID_CANDIDATES,
+        search_concurrency=config.BATCH_SEARCH_CONCURRENCY,
+        reranker=reranker,
+        rerank_candidates=config.RERANK_CANDIDATES,
+    )
+
+# ==================== ANSWER CACHE ====================
+def make_answer_cache():
+    return SemanticAnswerCache(
+        threshold=config.ANSWER_CACHE_THRESHOLD,
+        ttl_seconds=config.ANSWER_CACHE_TTL,
+        max_entries=config.ANSWER_CACHE_SIZE,
+    )
+
+# ==================== LIVE CORPUS ====================
+# Registry + retriever + answer caches, swapped as one by a hot reload (see hot_reload.py)
+def open_corpus(store, generation: int = 0) -> LiveCorpus:
+    # The manuals that were ingested (document / dialect partitions a query can be restricted to)
+    registry = load_registry(
+        config.DOCUMENTS_PATH if os.path.exists(config.DOCUMENTS_PATH) else config.CORPUS_REGISTRY, config.PDF_PATH,
+    )
+    docs = load_chunks(config.CORPUS_PATH) or []
+    sparse = BM25Index.load(config.SPARSE_INDEX_DIR, docs)
+    keywords = KeywordIndex.load(config.KEYWORD_INDEX_PATH, docs) if config.KEYWORD_LOOKUP else None
+    return LiveCorpus(registry, make_retriever(store, sparse, keywords), make_answer_cache, generation)
+
+live = open_corpus(vectorstore)
+print(f"📚 Documents: {', '.join(entry['id'] + ' (' + entry['dialect'] + ')' for entry in live.registry)}")
+print(f"🔎 Retrieval mode: {live.retriever.mode}, keyword lookup: {'on' if live.retriever.keywords else 'off'}, "
+      f"rerank: {'on' if reranker else 'off'}")
+
+# ==================== LLM SETUP ====================
+llm = make_llm()
+print(f"🤖 LLM ready ({config.LLM_PROVIDER})")
+
+# ==================== REQUEST COALESCING ====================
+# Identical concurrent questions share one retrieval + LLM call
+inflight = SingleFlight()
+ainflight = AsyncSingleFlight()
+
+def flight_key(query: str, filter=None) -> str:
+    return f"{filter_key(filter)}|{normalize_query(query)}"
+
+# ==================== ADMISSION CONTROL ====================
+# Bounds the queries talking to Cohere / Pinecone / Groq at once (one limiter per serving mode)
+admission = Admission(config.MAX_CONCURRENT_QUERIES, config.MAX_QUEUED_QUERIES, config.QUEUE_TIMEOUT)
+aadmission = AsyncAdmission(config.MAX_CONCURRENT_QUERIES, config.MAX_QUEUED_QUERIES, config.QUEUE_TIMEOUT)
+
+def batch_weight(queries) -> int:
+    # A batch has up to BATCH_LLM_CONCURRENCY upstream calls in flight, so it holds that many slots
+    return min(len(queries), config.BATCH_LLM_CONCURRENCY)
+
+# ==================== RAG HELPERS ====================
+def source_metadata(results) -> list:
+    keys = ("source", "document", "page", "page_label", "chunk_id")
+    return [{k: r.metadata[k] for k in keys if k in r.metadata} for r in results]
+
+def sse_event(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def cached_events(cached):
+    yield sse_event("token", {"token": cached["answer"]})
+    yield sse_event("sources", {"sources": cached["sources"], "cached": True})
+    yield sse_event("done", {})
+
+def error_message(e: Exception) -> str:
+    QUERY_ERRORS.inc()
+    return f"⚠️ Error processing query: {str(e)}"
+
+# ==================== INSTRUMENTATION ====================
+def timed_prompt(results, query: str) -> str:
+    with STAGE_SECONDS.time("prompt"):
+        return build_prompt(results, query)
+
+def record_tokens(usage, prompt: str, answer: str) -> None:
+    # Groq reports usage on the response (or the last stream chunk); otherwise estimate it
+    usage = usage or {}
+    LLM_TOKENS.inc("prompt", amount=usage.get("input_tokens") or estimate_tokens(prompt))
+    LLM_TOKENS.inc("completion", amount=usage.get("output_tokens") or estimate_tokens(answer))
+
+def lookup_answer(corpus, cache_key, filter=None):
+    # cache_key: the query vector, or the normalized question of a keyword-index hit (an exact-match entry)
+    cache = corpus.answer_cache(filter)
+    cached = cache.lookup_exact(cache_key) if isinstance(cache_key, str) else cache.lookup(cache_key)
+    ANSWER_CACHE_LOOKUPS.inc("miss" if cached is None else "hit")
+    return cached
+
+# ==================== RAG FUNCTIONS ====================
+# prepare() -> (cache key, cached answer, retrieved chunks). A keyword-index hit ("syntax of GROUP BY")
+# already knows its chunks and skips the embedding call entirely; its answer is cached under the normalized
+# question, since "what is GROUP BY" and "syntax of GROUP BY" share chunks but not answers.
+# `filter` ({"document": ...} / {"dialect": ...}) restricts every search to that partition.
+# Each request runs start to finish on the LiveCorpus it started with, even if a reload swaps `live`.
+def prepare(corpus, query: str, filter=None):
+    keyword, results = corpus.retriever.keyword_lookup(query, filter)
+    if keyword is not None:
+        cache_key = normalize_query(query)
+        cached = lookup_answer(corpus, cache_key, filter)
+        return cache_key, cached, None if cached is not None else results
+    # Embed once: the vector serves both the answer cache and the vector search
+    with STAGE_SECONDS.time("embed"):
+        query_vector = embeddings.embed_query(query)
+    cached = lookup_answer(corpus, query_vector, filter)
+    if cached is not None:
+        return query_vector, cached, None
+    with STAGE_SECONDS.time("search"):
+        return query_vector, None, corpus.retriever.retrieve(query, query_vector, filter)
+
+async def aprepare(corpus, query: str, filter=None):
+    keyword, results = corpus.retriever.keyword_lookup(query, filter)
+    if keyword is not None:
+        cache_key = normalize_query(query)
+        cached = lookup_answer(corpus, cache_key, filter)
+        return cache_key, cached, None if cached is not None else results
+    with STAGE_SECONDS.time("embed"):
+        query_vector = await embeddings.aembed_query(query)
+    cached = lookup_answer(corpus, query_vector, filter)
+    if cached is not None:
+        return query_vector, cached, None
+    with STAGE_SECONDS.time("search"):
+        return query_vector, None, await corpus.retriever.aretrieve(query, query_vector, filter)
+
+def remember(corpus, cache_key, answer: str, results, filter=None) -> None:
+    value = {"answer": answer, "sources": source_metadata(results)}
+    if isinstance(cache_key, str):
+        corpus.answer_cache(filter).store_exact(cache_key, value)
+    elif cache_key is not None:
+        corpus.answer_cache(filter).store(cache_key, value)
+
+def answer_query(query: str, filter=None) -> str:
+    # Raises on failure (the API turns that into a 502); get_answer() returns the error as text
+    with live.use() as corpus:
+        cache_key, cached, results = prepare(corpus, query, filter)
+        if cached is not None:
+            return cached["answer"]
+
+        prompt = timed_prompt(results, query)
+        with STAGE_SECONDS.time("llm"):
+            response = llm.invoke(prompt)
+        answer = response.content.strip()
+        record_tokens(response.usage_metadata, prompt, answer)
+        remember(corpus, cache_key, answer, results, filter)
+        return answer
+
+def get_answer(query: str, filter=None) -> str:
+    try:
+        return answer_query(query, filter)
+    except Exception as e:
+        return error_message(e)
+
+def stream_answer(query: str, filter=None):
+    # Yields SSE frames: many `token` events, then `sources`, then `done`
+    with live.use() as corpus:
+        try:
+            cache_key, cached, results = prepare(corpus, query, filter)
+            if cached is not None:
+                yield from cached_events(cached)
+                return
+
+            prompt, parts, usage = timed_prompt(results, query), [], None
+            start = time.perf_counter()
+            for chunk in llm.stream(prompt):
+                usage = chunk.usage_metadata or usage
+                if chunk.content:
+                    if not parts:
+                        STAGE_SECONDS.observe(time.perf_counter() - start, "llm_ttft")
+                    parts.append(chunk.content)
+                    yield sse_event("token", {"token": chunk.content})
+            STAGE_SECONDS.observe(time.perf_counter() - start, "llm")
+
+            answer = "".join(parts).strip()
+            record_tokens(usage, prompt, answer)
+            remember(corpus, cache_key, answer, results, filter)
+            yield sse_event("sources", {"sources": source_metadata(results), "cached": False})
+            yield sse_event("done", {})
+        except Exception as e:
+            yield sse_event("error", {"error": error_message(e)})
+
+# ==================== ASYNC RAG FUNCTIONS ====================
+# Same pipeline on the async clients, so one ASGI worker can keep hundreds of queries in flight
+async def aanswer_query(query: str, filter=None) -> str:
+    with live.use() as corpus:
+        cache_key, cached, results = await aprepare(corpus, query, filter)
+        if cached is not None:
+            return cached["answer"]
+
+        prompt = timed_prompt(results, query)
+        with STAGE_SECONDS.time("llm"):
+            response = await llm.ainvoke(prompt)
+        answer = response.content.strip()
+        record_tokens(response.usage_metadata, prompt, answer)
+        remember(corpus, cache_key, answer, results, filter)
+        return answer
+
+async def aget_answer(query: str, filter=None) -> str:
+    try:
+        return await aanswer_query(query, filter)
+    except Exception as e:
+        return error_message(e)
+
+async def astream_answer(query: str, filter=None):
+    with live.use() as corpus:
+        try:
+            cache_key, cached, results = await aprepare(corpus, query, filter)
+            if cached is not None:
+                for event in cached_events(cached):
+                    yield event
+                return
+
+            prompt, parts, usage = timed_prompt(results, query), [], None
+            start = time.perf_counter()
+            async for chunk in llm.astream(prompt):
+                usage = chunk.usage_metadata or usage
+                if chunk.content:
+                    if not parts:
+                        STAGE_SECONDS.observe(time.perf_counter() - start, "llm_ttft")
+                    parts.append(chunk.content)
+                    yield sse_event("token", {"token": chunk.content})
+            STAGE_SECONDS.observe(time.perf_counter() - start, "llm")
+
+            answer = "".join(parts).strip()
+            record_tokens(usage, prompt, answer)
+            remember(corpus, cache_key, answer, results, filter)
+            yield sse_event("sources", {"sources": source_metadata(results), "cached": False})
+            yield sse_event("done", {})
+        except Exception as e:
+            yield sse_event("error", {"error": error_message(e)})
+
+# ==================== BATCH RAG ====================
+# Keyword hits first, one embedding call for the rest, one retrieval pass, then bounded LLM fan-out.
+# Results keep the input order; a failing item gets {"error": ...} without failing the batch.
+# One optional filter applies to the whole batch.
+LLM_BATCH_CONFIG = {"max_concurrency": config.BATCH_LLM_CONCURRENCY}
+
+class BatchPlan:
+    def __init__(self, corpus, queries, filter=None):
+        self.corpus = corpus
+        self.queries = queries
+        self.filter = filter
+        self.results = [None] * len(queries)
+        self.query_vectors = [None] * len(queries)
+        self.cache_keys = [None] * len(queries)  # query vector, or normalized query for keyword-index hits
+        self.found = {}  # first index of a group -> retrieved chunks (or the Exception that stopped it)
+        for i, query in enumerate(queries):
+            keyword, docs = corpus.retriever.keyword_lookup(query, filter)
+            if keyword is not None:
+                self.found[i] = docs
+                self.cache_keys[i] = normalize_query(query)
+        self.to_embed = [i for i in range(len(queries)) if i not in self.found]
+
+    def set_vectors(self, vectors) -> None:
+        for i, vector in zip(self.to_embed, vectors):
+            self.query_vectors[i] = self.cache_keys[i] = vector
+
+    def group(self, embed_error=None) -> None:
+        pending = {}  # normalized query -> indices, so duplicates in a batch are answered once
+        for i, query in enumerate(self.queries):
+            if i not in self.found and embed_error is not None:
+                self.results[i] = {"error": error_message(embed_error)}
+                continue
+            cached = lookup_answer(self.corpus, self.cache_keys[i], self.filter)
+            if cached is not None:
+                self.results[i] = {"answer": cached["answer"], "cached": True}
+                continue
+            pending.setdefault(normalize_query(query), []).append(i)
+        self.groups = list(pending.values())
+        self.to_search = [group[0] for group in self.groups if group[0] not in self.found]
+
+    def search_args(self):
+        return [self.queries[i] for i in self.to_search], [self.query_vectors[i] for i in self.to_search], self.filter
+
+    def prompts(self, searched):
+        self.found.update(zip(self.to_search, searched))
+        self.llm_groups, self.llm_prompts = [], []
+        for group in self.groups:
+            docs = self.found[group[0]]
+            if isinstance(docs, Exception):
+                for i in group:
+                    self.results[i] = {"error": error_message(docs)}
+            else:
+                self.llm_groups.append(group)
+                self.llm_prompts.append(timed_prompt(docs, self.queries[group[0]]))
+        return self.llm_prompts
+
+    def collect(self, responses):
+        for group, prompt, response in zip(self.llm_groups, self.llm_prompts, responses):
+            if isinstance(response, Exception):
+                item = {"error": error_message(response)}
+            else:
+                item = {"answer": response.content.strip()}
+                record_tokens(response.usage_metadata, prompt, item["answer"])
+                remember(self.corpus, self.cache_keys[group[0]], item["answer"], self.found[group[0]], self.filter)
+            for i in group:
+                self.results[i] = item
+        return self.results
+
+def get_answers(queries, filter=None) -> list:
+    with live.use() as corpus:
+        plan, embed_error = BatchPlan(corpus, queries, filter), None
+        try:
+            with STAGE_SECONDS.time("embed_batch"):
+                plan.set_vectors(embeddings.embed_queries([queries[i] for i in plan.to_embed]) if plan.to_embed else [])
+        except Exception as e:
+            embed_error = e
+        plan.group(embed_error)
+        with STAGE_SECONDS.time("search_batch"):
+            prompts = plan.prompts(corpus.retriever.retrieve_many(*plan.search_args()) if plan.to_search else [])
+        with STAGE_SECONDS.time("llm_batch"):
+            responses = llm.batch(prompts, config=LLM_BATCH_CONFIG, return_exceptions=True) if prompts else []
+        return plan.collect(responses)
+
+async def aget_answers(queries, filter=None) -> list:
+    with live.use() as corpus:
+        plan, embed_error = BatchPlan(corpus, queries, filter), None
+        try:
+            with STAGE_SECONDS.time("embed_batch"):
+                plan.set_vectors(await embeddings.aembed_queries([queries[i] for i in plan.to_embed]) if plan.to_embed else [])
+        except Exception as e:
+            embed_error = e
+        plan.group(embed_error)
+        with STAGE_SECONDS.time("search_batch"):
+            prompts = plan.prompts(await corpus.retriever.aretrieve_many(*plan.search_args()) if plan.to_search else [])
+        with STAGE_SECONDS.time("llm_batch"):
+            responses = await llm.abatch(prompts, config=LLM_BATCH_CONFIG, return_exceptions=True) if prompts else []
+        return plan.collect(responses)
+
+# ==================== STATS ====================
+def stats() -> dict:
+    corpus = live
+    result = {
+        "corpus": corpus.stats(),
+        "answer_cache": corpus.answer_cache().stats(),
+        "answer_cache_partitions": {key: cache.stats() for key, cache in corpus.answer_caches.items() if key},
+        "embedding_cache": embeddings.stats(),
+        "singleflight": inflight.stats(),
+        "singleflight_async": ainflight.stats(),
+        "admission": admission.stats(),
+        "admission_async": aadmission.stats(),
+    }
+    if reranker is not None:
+        result["reranker"] = reranker.stats()
+    return result
+
+def cache_metrics():
+    # Scrape-time view of every cache; the answer caches are replaced on reload, so they are counted in rag
+    counts = {"answer": (ANSWER_CACHE_LOOKUPS.value("hit"), ANSWER_CACHE_LOOKUPS.value("miss"))}
+    embedding = embeddings.stats()
+    counts["embedding"] = (embedding["hits"], embedding["misses"])
+    if reranker is not None:
+        rerank = reranker.stats()
+        counts["rerank"] = (rerank["hits"], rerank["misses"])
+    lookups = [({"cache": cache, "result": result}, count)
+               for cache, (hits, misses) in counts.items() for result, count in (("hit", hits), ("miss", misses))]
+    ratios = [({"cache": cache}, hits / (hits + misses) if hits + misses else 0.0) for cache, (hits, misses) in counts.items()]
+    return [
+        ("rag_cache_lookups_total", "counter", "Cache lookups by cache and result.", lookups),
+        ("rag_cache_hit_ratio", "gauge", "Hits / lookups since the process started.", ratios),
+        ("rag_corpus_generation", "gauge", "Corpus reloads since the process started.", [({}, live.generation)]),
+    ]
+
+def admission_metrics():
+    limiters = (admission, aadmission)
+    return [
+        ("rag_admission_queue_depth", "gauge", "Queries waiting for a concurrency slot.",
+         [({"mode": limiter.mode}, limiter.waiting) for limiter in limiters]),
+        ("rag_admission_active", "gauge", "Queries holding a concurrency slot.",
+         [({"mode": limiter.mode}, limiter.active) for limiter in limiters]),
+    ]
+
+register_collector(cache_metrics)
+register_collector(admission_metrics)
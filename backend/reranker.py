@@ -0,0 +1,170 @@
+import os
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import numpy as np
+
+from retrieval import doc_key
+from singleflight import normalize_query
+
+MAX_WAITING_PASSES = 1  # passes queued behind the running one; beyond that a query skips reranking
+
+
+def resolve_model_files(model: str, model_file: str):
+    # model: a local directory, or a Hugging Face repo id that is downloaded once into the HF cache
+    if os.path.isdir(model):
+        return os.path.join(model, model_file), os.path.join(model, "tokenizer.json")
+    from huggingface_hub import hf_hub_download
+    return hf_hub_download(model, model_file), hf_hub_download(model, "tokenizer.json")
+
+
+# ==================== CROSS-ENCODER RERANKER ====================
+class CrossEncoderReranker:
+    """Reorders retrieval candidates with a small ONNX cross-encoder (e.g. quantized MiniLM) on CPU.
+
+    All uncached (query, chunk) pairs of a query are scored in one padded forward pass. If the pass
+    doesn't finish within `budget_ms` (queueing included) the candidates come back in vector order:
+    a pass that hasn't started is cancelled, a running one finishes and its scores still land in the cache.
+    budget_ms=None waits for every pass (offline evaluation).
+    When passes are already waiting for the model, a query keeps vector order without queueing another,
+    so an overloaded CPU never works through passes nobody is waiting for.
+    """
+
+    def __init__(self, model_path: str, tokenizer_path: str, budget_ms: float = 150, max_length: int = 256,
+                 cache_size: int = 10000, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.budget = budget_ms / 1000 if budget_ms is not None else None
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.skipped = 0
+        self._inflight = 0  # submitted passes not finished or cancelled yet
+        self._cache = OrderedDict()  # (normalized query, chunk key) -> score
+        self._lock = threading.Lock()
+        # One pass at a time: onnxruntime already spreads a pass over the cores
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+    # ---------- model ----------
+    def score(self, query: str, texts):
+        encodings = self.tokenizer.encode_batch([(query, text) for text in texts])
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        logits = self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+        # One relevance logit per pair; two-class heads put "relevant" last
+        return logits.reshape(len(texts), -1)[:, -1]
+
+    # ---------- (query, chunk) score cache ----------
+    def _lookup(self, query: str, docs):
+        query_key = normalize_query(query)
+        scores, pending = {}, {}
+        with self._lock:
+            for doc in docs:
+                key = doc_key(doc)
+                score = self._cache.get((query_key, key))
+                if score is not None:
+                    self._cache.move_to_end((query_key, key))
+                    scores[key] = score
+                    self.hits += 1
+                elif key not in pending:
+                    pending[key] = doc.page_content
+                    self.misses += 1
+        return scores, pending
+
+    def _score_pending(self, query: str, pending: dict) -> dict:
+        scores = dict(zip(pending, self.score(query, list(pending.values())).tolist()))
+        query_key = normalize_query(query)
+        with self._lock:
+            for key, score in scores.items():
+                self._cache[(query_key, key)] = score
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores
+
+    @staticmethod
+    def _order(docs, scores: dict, k: int):
+        # Stable sort, so equal scores keep vector order
+        return sorted(docs, key=lambda doc: -scores[doc_key(doc)])[:k]
+
+    # ---------- rerank ----------
+    def _submit(self, query: str, pending: dict):
+        # None when the model is busy with a backlog already
+        with self._lock:
+            if self._inflight > MAX_WAITING_PASSES:
+                self.skipped += 1
+                return None
+            self._inflight += 1
+        future = self._pool.submit(self._score_pending, query, pending)
+        future.add_done_callback(self._pass_done)  # also runs when the pass is cancelled
+        return future
+
+    def _pass_done(self, future) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    def rerank(self, query: str, docs, k: int):
+        scores, pending = self._lookup(query, docs)
+        if pending:
+            future = self._submit(query, pending)
+            if future is None:
+                return docs[:k]
+            try:
+                scores.update(future.result(timeout=self.budget))
+            except FutureTimeout:
+                future.cancel()  # only drops a pass that hasn't started
+                self.timeouts += 1
+                return docs[:k]
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Rerank failed, keeping vector order: {e}")
+                return docs[:k]
+        return self._order(docs, scores, k)
+
+    async def arerank(self, query: str, docs, k: int):
+        scores, pending = self._lookup(query, docs)
+        if pending:
+            future = self._submit(query, pending)
+            if future is None:
+                return docs[:k]
+            try:
+                # shield: a timed-out pass that already runs still finishes and fills the cache
+                scores.update(await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.budget))
+            except asyncio.TimeoutError:
+                future.cancel()
+                self.timeouts += 1
+                return docs[:k]
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Rerank failed, keeping vector order: {e}")
+                return docs[:k]
+        return self._order(docs, scores, k)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "queued_passes": self._inflight,
+            "entries": len(self._cache),
+            "budget_ms": self.budget * 1000 if self.budget is not None else None,
+        }
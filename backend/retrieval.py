@@ -0,0 +1,127 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from corpus_registry import matches, filter_key
+
+
+# ==================== RECIPROCAL RANK FUSION ====================
+def doc_key(doc):
+    return doc.metadata.get("chunk_id") or doc.id or doc.page_content
+
+
+def reciprocal_rank_fusion(rankings, k: int, rrf_k: int = 60):
+    scores, docs = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            docs.setdefault(key, doc)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[key] for key in best]
+
+
+# ==================== RETRIEVER ====================
+class Retriever:
+    """Dense vector search, optionally fused with BM25 keyword search ("hybrid" mode).
+
+    `keyword_lookup` is consulted before any of it: exact SQL keyword hits come from a precomputed index.
+    With a `reranker`, `rerank_candidates` fused results go through it and the best k are kept.
+    Every stage takes an optional metadata `filter` ({"document": ...} / {"dialect": ...}) that is
+    applied inside the vector and BM25 searches, not to their results.
+    """
+
+    def __init__(self, vectorstore, sparse=None, keywords=None, mode: str = "hybrid", k: int = 3,
+                 candidates: int = 10, rrf_k: int = 60, search_concurrency: int = 16, reranker=None,
+                 rerank_candidates: int = 20):
+        self.vectorstore = vectorstore
+        self.sparse = sparse if sparse is not None and len(sparse) else None
+        self.keywords = keywords if keywords is not None and len(keywords) else None
+        self.mode = mode if self.sparse is not None else "dense"
+        self.k = k
+        self.reranker = reranker
+        self.pool_k = max(rerank_candidates, k) if reranker is not None else k  # survivors of fusion
+        self.candidates = max(candidates, self.pool_k)
+        self.rrf_k = rrf_k
+        self.search_concurrency = search_concurrency
+        self._sparse_partitions = {}  # filter key -> BM25 corpus rows
+
+    @property
+    def fetch_k(self) -> int:
+        return self.candidates if self.mode == "hybrid" else self.pool_k
+
+    def _sparse_rows(self, filter):
+        if not filter:
+            return None
+        key = filter_key(filter)
+        if key not in self._sparse_partitions:
+            self._sparse_partitions[key] = [row for row, doc in enumerate(self.sparse.docs) if matches(doc.metadata, filter)]
+        return self._sparse_partitions[key]
+
+    def _fuse(self, query: str, dense, filter=None):
+        if self.mode != "hybrid":
+            return dense[:self.pool_k]
+        sparse = [doc for doc, _ in self.sparse.search(query, self.candidates, rows=self._sparse_rows(filter))]
+        return reciprocal_rank_fusion([dense, sparse], self.pool_k, self.rrf_k)
+
+    def _finish(self, query: str, dense, filter=None):
+        fused = self._fuse(query, dense, filter)
+        return self.reranker.rerank(query, fused, self.k) if self.reranker is not None else fused
+
+    async def _afinish(self, query: str, dense, filter=None):
+        fused = self._fuse(query, dense, filter)
+        return await self.reranker.arerank(query, fused, self.k) if self.reranker is not None else fused
+
+    # ---------- exact keyword lookup (no embedding needed) ----------
+    def keyword_lookup(self, query: str, filter=None):
+        if self.keywords is None:
+            return None, []
+        # (None, []) when no manual in the filter defines the keyword: the query falls back to vector search
+        return self.keywords.lookup(query, filter, self.k)
+
+    # ---------- single query ----------
+    def retrieve(self, query: str, query_vector, filter=None):
+        dense = self.vectorstore.similarity_search_by_vector(query_vector, k=self.fetch_k, filter=filter)
+        return self._finish(query, dense, filter)
+
+    async def aretrieve(self, query: str, query_vector, filter=None):
+        dense = await self.vectorstore.asimilarity_search_by_vector(query_vector, k=self.fetch_k, filter=filter)
+        return await self._afinish(query, dense, filter)
+
+    # ---------- batches (per-item Exceptions instead of failing the batch) ----------
+    def _finish_many(self, queries, found, filter=None):
+        return [
+            docs if isinstance(docs, Exception) else self._finish(query, docs, filter)
+            for query, docs in zip(queries, found)
+        ]
+
+    async def _afinish_many(self, queries, found, filter=None):
+        async def finish(query, docs):
+            return docs if isinstance(docs, Exception) else await self._afinish(query, docs, filter)
+
+        return await asyncio.gather(*(finish(query, docs) for query, docs in zip(queries, found)))
+
+    def retrieve_many(self, queries, query_vectors, filter=None):
+        # The local store answers every query with a single matmul; remote stores get concurrent requests
+        if hasattr(self.vectorstore, "similarity_search_by_vectors"):
+            found = self.vectorstore.similarity_search_by_vectors(query_vectors, k=self.fetch_k, filter=filter)
+        else:
+            with ThreadPoolExecutor(max_workers=self.search_concurrency) as pool:
+                futures = [
+                    pool.submit(self.vectorstore.similarity_search_by_vector, v, k=self.fetch_k, filter=filter)
+                    for v in query_vectors
+                ]
+                found = [future.exception() or future.result() for future in futures]
+        return self._finish_many(queries, found, filter)
+
+    async def aretrieve_many(self, queries, query_vectors, filter=None):
+        if hasattr(self.vectorstore, "similarity_search_by_vectors"):
+            found = self.vectorstore.similarity_search_by_vectors(query_vectors, k=self.fetch_k, filter=filter)
+            return await self._afinish_many(queries, found, filter)
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+
+        async def search(query_vector):
+            async with semaphore:
+                return await self.vectorstore.asimilarity_search_by_vector(query_vector, k=self.fetch_k, filter=filter)
+
+        found = await asyncio.gather(*(search(v) for v in query_vectors), return_exceptions=True)
+        return await self._afinish_many(queries, found, filter)
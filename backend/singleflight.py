@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+
+# ==================== SINGLE-FLIGHT ====================
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution and all receive its result."""
+
+    def __init__(self):
+        self.executed = 0
+        self.deduplicated = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.deduplicated += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        return {"executed": self.executed, "deduplicated": self.deduplicated, "in_flight": len(self._calls)}
+
+
+def normalize_query(query: str) -> str:
+    # "What is a LEFT JOIN? " and "what is a left join" are the same question
+    return " ".join(query.casefold().split()).rstrip("?!. ")
+
+
+# ==================== ASYNC SINGLE-FLIGHT ====================
+class AsyncSingleFlight:
+    """asyncio flavour: followers await the leader's task instead of blocking a thread."""
+
+    def __init__(self):
+        self.executed = 0
+        self.deduplicated = 0
+        self._calls = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.executed += 1
+        else:
+            self.deduplicated += 1
+        # shield: a disconnecting client must not cancel the call everyone else is waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"executed": self.executed, "deduplicated": self.deduplicated, "in_flight": len(self._calls)}
@@ -0,0 +1,103 @@
+import os
+import re
+import json
+from collections import Counter
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def tokenize(text: str):
+    # Keeps SQL identifiers like row_number / coalesce intact
+    return TOKEN_RE.findall(text.lower())
+
+
+# ==================== BM25 INVERTED INDEX ====================
+class BM25Index:
+    """CSR-style inverted index: postings for term t live in doc_ids/weights[offsets[t]:offsets[t + 1]].
+
+    BM25 term weights are precomputed at build time, so a query is just a sum of posting slices.
+    """
+
+    def __init__(self, vocab: dict, offsets, doc_ids, weights, docs):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.docs = docs
+
+    def __len__(self):
+        return len(self.docs)
+
+    @classmethod
+    def build(cls, docs, k1: float = 1.2, b: float = 0.75):
+        term_counts = [Counter(tokenize(doc.page_content)) for doc in docs]
+        lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(docs) else 1.0
+
+        postings = {}
+        for row, counts in enumerate(term_counts):
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((row, tf))
+
+        vocab = {term: i for i, term in enumerate(sorted(postings))}
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        doc_ids, weights = [], []
+        for term, i in vocab.items():
+            entries = postings[term]
+            idf = np.log(1 + (len(docs) - len(entries) + 0.5) / (len(entries) + 0.5))
+            for row, tf in entries:
+                norm = k1 * (1 - b + b * lengths[row] / max(avg_length, 1e-9))
+                doc_ids.append(row)
+                weights.append(idf * tf * (k1 + 1) / (tf + norm))
+            offsets[i + 1] = len(doc_ids)
+
+        return cls(vocab, offsets, np.array(doc_ids, dtype=np.int32), np.array(weights, dtype=np.float32), list(docs))
+
+    def scores(self, query: str):
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = self.vocab.get(term)
+            if i is not None:
+                start, end = self.offsets[i], self.offsets[i + 1]
+                scores[self.doc_ids[start:end]] += self.weights[start:end]
+        return scores
+
+    def search(self, query: str, k: int, rows=None):
+        # rows: restrict the ranking to these corpus rows (a document / dialect partition)
+        scores = self.scores(query)
+        if rows is not None:
+            mask = np.zeros(len(self.docs), dtype=bool)
+            mask[rows] = True
+            scores[~mask] = 0
+        hits = np.flatnonzero(scores)
+        if not hits.size:
+            return []
+        if hits.size > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits])]
+        return [(self.docs[row], float(scores[row])) for row in hits]
+
+    # ---------- persistence ----------
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        np.savez(
+            os.path.join(path, "postings.npz"),
+            offsets=self.offsets, doc_ids=self.doc_ids, weights=self.weights, doc_count=np.int64(len(self.docs)),
+        )
+        with open(os.path.join(path, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f)
+
+    @classmethod
+    def load(cls, path: str, docs):
+        # docs: the corpus chunks the index was built from, in the same order
+        if not os.path.exists(os.path.join(path, "postings.npz")):
+            return None
+        arrays = np.load(os.path.join(path, "postings.npz"))
+        if int(arrays["doc_count"]) != len(docs):
+            print(f"⚠️ BM25 index at {path} does not match the corpus, ignoring it")
+            return None
+        with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        return cls(vocab, arrays["offsets"], arrays["doc_ids"], arrays["weights"], docs)
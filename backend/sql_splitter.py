@@ -0,0 +1,159 @@
+import re
+from collections import Counter
+
+from langchain_core.documents import Document
+
+MONOSPACE_FONTS = ("courier", "mono", "consolas", "menlo", "lucidaconsole")
+SQL_STATEMENT_RE = re.compile(
+    r"^\s*(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|WITH|FROM|WHERE|GROUP BY|ORDER BY|HAVING|JOIN|VALUES)\b"
+)
+
+
+# ==================== LAYOUT EXTRACTION (runs in pdf_loader workers) ====================
+def extract_lines(page):
+    """[(text, font_name, font_size)] per visual line, using pypdf's text visitor."""
+    lines, current = [], {"text": [], "font": "", "size": 0.0, "y": None}
+
+    def flush():
+        text = "".join(current["text"]).strip()
+        if text:
+            lines.append((text, current["font"], round(current["size"], 1)))
+        current.update(text=[], font="", size=0.0)
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        font = str((font_dict or {}).get("/BaseFont", "")).split("+")[-1].lower()
+        size = font_size * (abs(tm[3]) or 1) * (abs(cm[3]) or 1)
+        y = tm[5] * (cm[3] or 1) + cm[5]
+        if current["y"] is not None and abs(y - current["y"]) > 1 and current["text"]:
+            flush()
+        current["y"] = y
+        for i, part in enumerate(text.split("\n")):
+            if i:
+                flush()
+            if part.strip():
+                current["text"].append(part)
+                # The line takes the style of its largest run (headings often mix sizes)
+                if size >= current["size"]:
+                    current["font"], current["size"] = font, size
+
+    page.extract_text(visitor_text=visitor)
+    flush()
+    return lines
+
+
+# ==================== CLASSIFICATION ====================
+def body_font_size(pages) -> float:
+    # Character-weighted median font size: what most of the text is set in
+    weights = Counter()
+    for _, lines in pages:
+        for text, _, size in lines:
+            weights[size] += len(text)
+    seen, half = 0, sum(weights.values()) / 2
+    for size in sorted(weights):
+        seen += weights[size]
+        if seen >= half:
+            return size
+    return 0.0
+
+
+def classify(lines, body_size: float):
+    """Tag each line as heading / code / text from font metadata."""
+    tagged = []
+    for text, font, size in lines:
+        monospace = any(name in font for name in MONOSPACE_FONTS)
+        bold = "bold" in font or "black" in font or "heavy" in font
+        if monospace or (SQL_STATEMENT_RE.match(text) and text.rstrip().endswith((";", ","))):
+            kind = "code"
+        elif len(text) <= 80 and not text.endswith((".", ",", ";")) and (size >= body_size * 1.15 or (bold and size >= body_size)):
+            kind = "heading"
+        else:
+            kind = "text"
+        tagged.append((text, kind))
+    return tagged
+
+
+# ==================== SECTION CHUNKING ====================
+class SQLManualSplitter:
+    """Chunks that follow the manual's sections: no overlap, code blocks and syntax boxes kept whole.
+
+    A section is everything between two headings. Small sections are merged forward, large ones are
+    packed into pieces at paragraph / code-block boundaries, each piece prefixed with its heading.
+    """
+
+    def __init__(self, max_chars: int = 1500, min_chars: int = 200):
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+
+    def split_pages(self, pages):
+        # pages: [(page metadata, [(text, font, size), ...])] in page order
+        body_size = body_font_size(pages)
+
+        sections, current = [], None
+        for metadata, lines in pages:
+            for text, kind in classify(lines, body_size):
+                if kind == "heading":
+                    if current is None or current["units"]:
+                        current = {"heading": text, "metadata": metadata, "units": []}
+                        sections.append(current)
+                    else:
+                        current["heading"] += " " + text  # multi-line heading
+                    continue
+                if current is None:
+                    current = {"heading": "", "metadata": metadata, "units": []}
+                    sections.append(current)
+                units = current["units"]
+                if units and units[-1][1] == kind:
+                    units[-1] = (units[-1][0] + "\n" + text, kind)
+                else:
+                    units.append((text, kind))
+        return self._chunks(self._merge_small(sections))
+
+    def _merge_small(self, sections):
+        merged = []
+        for section in sections:
+            size = len(section["heading"]) + sum(len(text) for text, _ in section["units"])
+            if merged and merged[-1]["size"] < self.min_chars:
+                previous = merged[-1]
+                previous["units"] += [(section["heading"], "heading")] if section["heading"] else []
+                previous["units"] += section["units"]
+                previous["size"] += size
+            else:
+                merged.append({**section, "size": size})
+        return merged
+
+    def _pieces(self, text: str, kind: str):
+        if len(text) <= self.max_chars:
+            return [(text, kind)]
+        # Only oversized blocks are cut, on line boundaries
+        pieces, buffer = [], ""
+        for line in text.split("\n"):
+            if buffer and len(buffer) + len(line) + 1 > self.max_chars:
+                pieces.append((buffer, kind))
+                buffer = ""
+            while len(line) > self.max_chars:  # a single runaway line
+                pieces.append((line[:self.max_chars], kind))
+                line = line[self.max_chars:]
+            buffer = f"{buffer}\n{line}" if buffer else line
+        return pieces + ([(buffer, kind)] if buffer else [])
+
+    def _chunks(self, sections):
+        docs = []
+        for section in sections:
+            heading = section["heading"]
+            metadata = {**section["metadata"], "section": heading}
+            budget = self.max_chars - len(heading) - 1
+            buffer = []
+            for unit in [piece for text, kind in section["units"] for piece in self._pieces(text, kind)]:
+                if buffer and sum(len(text) + 2 for text, _ in buffer) + len(unit[0]) > budget:
+                    docs.append(self._document(heading, buffer, metadata))
+                    buffer = []
+                buffer.append(unit)
+            if buffer or heading:
+                docs.append(self._document(heading, buffer, metadata))
+        return docs
+
+    @staticmethod
+    def _document(heading: str, units, metadata):
+        body = "\n\n".join(text for text, _ in units)
+        content = f"{heading}\n{body}" if heading and body else heading or body
+        return Document(page_content=content, metadata=dict(metadata))
@@ -38,6 +38,39 @@ function parseMarkdown(text) {
     .replace(/\n/g, "<br>");                          // line breaks
 }
 
+// --- Render the source pages sent after the answer ---
+function renderSources(sources) {
+  const pages = [...new Set(sources.map(s => s.page_label || (s.page !== undefined ? s.page + 1 : null)).filter(Boolean))];
+  return pages.length ? `<p class="sources">📚 Sources: page ${pages.join(", ")}</p>` : "";
+}
+
+// --- Read Server-Sent Events from a streaming fetch response ---
+async function readEvents(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
 // --- Main click event ---
 askBtn.addEventListener("click", async () => {
   const query = queryInput.value.trim();
@@ -51,18 +84,51 @@ askBtn.addEventListener("click", async () => {
     <p>Thinking...</p>
   `;
 
+  let answer = "";
+  let sourcesHtml = "";
+  let renderPending = false;
+
+  // Re-render at most once per frame while tokens stream in
+  const render = () => {
+    if (renderPending) return;
+    renderPending = true;
+    requestAnimationFrame(() => {
+      renderPending = false;
+      responseDiv.innerHTML = `<div class="markdown-body">${parseMarkdown(answer)}</div>${sourcesHtml}`;
+    });
+  };
+
   try {
-    const response = await fetch("http://127.0.0.1:8502/query", {
+    const response = await fetch("http://127.0.0.1:8502/query/stream", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ query }),
     });
 
+    if (response.status === 429 || response.status === 503) {
+      const retryAfter = response.headers.get("Retry-After") || "a few";
+      responseDiv.innerHTML = `<p class='error'>⏳ The server is busy. Please try again in ${retryAfter} seconds.</p>`;
+      return;
+    }
     if (!response.ok) throw new Error("Server Error");
 
-    const data = await response.json();
-    const answer = data.answer || "No answer found.";
-    responseDiv.innerHTML = `<div class="markdown-body">${parseMarkdown(answer)}</div>`;
+    await readEvents(response, (event, data) => {
+      if (event === "token") {
+        answer += data.token;
+        render();
+      } else if (event === "sources") {
+        sourcesHtml = renderSources(data.sources || []);
+        render();
+      } else if (event === "error") {
+        answer = data.error;
+        render();
+      }
+    });
+
+    if (!answer) {
+      answer = "No answer found.";
+      render();
+    }
   } catch (err) {
     responseDiv.innerHTML = "<p class='error'>❌ Unable to connect to backend. Please ensure it's running on port 8502.</p>";
   }